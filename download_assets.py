@@ -23,12 +23,12 @@ When to run this:
 - Manually if you delete the static/ folder
 - After cloning the repo for the first time
 """
+import sys
 import urllib.request
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-# Create static directory if it doesn't exist
 static_dir = Path("static")
-static_dir.mkdir(exist_ok=True)
 
 # Assets to download
 assets = {
@@ -36,38 +36,60 @@ assets = {
     "alpine.min.js": "https://unpkg.com/alpinejs@3.13.3/dist/cdn.min.js",
 }
 
-print("Downloading static assets...")
+CUSTOM_CSS = """/* Custom styles for Vela */
+.htmx-indicator {
+    display: none;
+}
+.htmx-request .htmx-indicator {
+    display: inline;
+}
+.htmx-request.htmx-indicator {
+    display: inline;
+}
+"""
+
 
-for filename, url in assets.items():
+def download_asset(filename, url):
+    """Download one asset unless it already exists, returning True on success"""
     filepath = static_dir / filename
 
     if filepath.exists():
         print(f"[OK] {filename} already exists")
-        continue
+        return True
 
     try:
         print(f"Downloading {filename}...")
         urllib.request.urlretrieve(url, filepath)
         print(f"[OK] Downloaded {filename}")
+        return True
     except Exception as e:
         print(f"[ERROR] Failed to download {filename}: {e}")
+        return False
+
+
+def main():
+    """Download missing assets in parallel, returning a process exit code"""
+    # Create static directory if it doesn't exist
+    static_dir.mkdir(exist_ok=True)
+
+    print("Downloading static assets...")
+
+    with ThreadPoolExecutor(max_workers=len(assets)) as executor:
+        results = list(executor.map(download_asset, assets.keys(), assets.values()))
+
+    # Create placeholder CSS file
+    css_file = static_dir / "custom.css"
+    if not css_file.exists():
+        css_file.write_text(CUSTOM_CSS)
+        print("[OK] Created custom.css")
+
+    if not all(results):
+        print("\nSome assets failed to download.")
+        return 1
+
+    print("\nAll assets downloaded successfully!")
+    return 0
 
-# Create placeholder CSS file
-css_file = static_dir / "custom.css"
-if not css_file.exists():
-    css_file.write_text(
-        """/* Custom styles for Vela */
-.htmx-indicator {
-    display: none;
-}
-.htmx-request .htmx-indicator {
-    display: inline;
-}
-.htmx-request.htmx-indicator {
-    display: inline;
-}
-"""
-    )
-    print("[OK] Created custom.css")
 
-print("\nAll assets downloaded successfully!")
+if __name__ == "__main__":
+    sys.exit(main())
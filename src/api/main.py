@@ -3,19 +3,25 @@
 from fastapi import FastAPI, Request, Depends, HTTPException
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 import logging
 from pathlib import Path
+from typing import Any
 from sqlmodel import Session, select
 
 from src.shared.config import settings
-from src.shared.database import init_database, get_session
-from src.shared.models import AdminUser, Guild
+from src.shared.database import init_database, get_session, is_setup_completed
+from src.shared.models import Guild
 from src.api.routers import auth, admin, htmx, api, setup
 from src.api.routers.auth import get_current_user
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
 # Get the project root directory
@@ -91,7 +97,7 @@ async def lifespan(app: FastAPI):
     print("\n" + "=" * 80 + "\n")
 
     logger.info("Starting FastAPI application")
-    init_database()
+    await asyncio.to_thread(init_database)
 
     try:
         yield
@@ -103,11 +109,22 @@ async def lifespan(app: FastAPI):
         logger.info("Shutting down FastAPI application")
 
 
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson when it is installed"""
+
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return super().render(content)
+        # Like json.dumps, accept non-string dict keys
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
 # Create FastAPI app
 app = FastAPI(
     title="Vela Admin Panel",
     description="Web interface for managing Vela Discord bot",
     lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 
 # Add CORS middleware
@@ -133,15 +150,10 @@ async def setup_check_middleware(request: Request, call_next):
     ):
         return await call_next(request)
 
-    # Check if admin exists
-    from src.shared.database import SessionLocal
-
-    with SessionLocal() as session:
-        admin_exists = session.exec(select(AdminUser).limit(1)).first()
-
-        if not admin_exists and request.url.path != "/setup":
-            # No admin exists, redirect to setup
-            return RedirectResponse(url="/setup", status_code=302)
+    # Check if admin exists; cached once setup is completed
+    if not is_setup_completed():
+        # No admin exists, redirect to setup
+        return RedirectResponse(url="/setup", status_code=302)
 
     return await call_next(request)
 
@@ -158,12 +170,10 @@ app.include_router(api.router, prefix="/api", tags=["api"])
 
 
 @app.get("/", response_class=HTMLResponse)
-async def index(request: Request, session: Session = Depends(get_session)):
+async def index(request: Request):
     """Home page - redirect to setup or dashboard"""
     # Check if any admin exists
-    admin_exists = session.exec(select(AdminUser).limit(1)).first()
-
-    if not admin_exists:
+    if not is_setup_completed():
         # No admin exists, redirect to setup
         return RedirectResponse(url="/setup", status_code=302)
 
@@ -1,13 +1,14 @@
 """REST API router for JSON endpoints"""
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.orm.attributes import flag_modified
 from sqlmodel import Session, select
 from typing import List, Optional
 from datetime import datetime
 import logging
-import discord
 
 from src.shared.database import get_session
+from src.shared.guild_cache import invalidate_guild_cache
 from src.shared.models import Member, Guild, Config, AuditLog, Role, Channel
 from src.api.routers.auth import get_current_user
 from src.api.models.schemas import (
@@ -92,7 +93,7 @@ async def get_user(
     current_user=Depends(get_current_user),
 ):
     """Get single user details including approval information"""
-    user = session.exec(select(Member).where(Member.id == user_id)).first()
+    user = session.get(Member, user_id)
 
     if not user:
         raise HTTPException(404, "User not found")
@@ -145,7 +146,7 @@ async def delete_user(
     current_user=Depends(get_current_user),
 ):
     """Delete a user from the database and reset their Discord nickname"""
-    user = session.exec(select(Member).where(Member.id == user_id)).first()
+    user = session.get(Member, user_id)
 
     if not user:
         raise HTTPException(404, "User not found")
@@ -263,7 +264,7 @@ async def approve_user(
     current_user=Depends(get_current_user),
 ):
     """Approve a pending onboarding request"""
-    user = session.exec(select(Member).where(Member.id == user_id)).first()
+    user = session.get(Member, user_id)
 
     if not user:
         raise HTTPException(404, "User not found")
@@ -419,6 +420,9 @@ async def approve_user(
                                             break
 
                                     if user_id_found:
+                                        # Only loaded once the bot is running
+                                        import discord
+
                                         # Found the approval request message! Update it
                                         logger.info(
                                             f"Found approval request message (ID: {message.id}) for user {user.username}"
@@ -498,7 +502,7 @@ async def demote_user(
     current_user=Depends(get_current_user),
 ):
     """Demote an onboarded user (remove role and nickname but keep data)"""
-    user = session.exec(select(Member).where(Member.id == user_id)).first()
+    user = session.get(Member, user_id)
 
     if not user:
         raise HTTPException(404, "User not found")
@@ -621,7 +625,7 @@ async def restore_user(
     current_user=Depends(get_current_user),
 ):
     """Restore a demoted user (re-add role and nickname)"""
-    user = session.exec(select(Member).where(Member.id == user_id)).first()
+    user = session.get(Member, user_id)
 
     if not user:
         raise HTTPException(404, "User not found")
@@ -920,6 +924,7 @@ async def configure_channel(
     )
     session.add(audit_log)
     session.commit()
+    invalidate_guild_cache(current_user["guild_id"])
 
     logger.info(f"Channel {channel_type} configured by {current_user['username']}")
 
@@ -1006,6 +1011,7 @@ async def configure_role(
     )
     session.add(audit_log)
     session.commit()
+    invalidate_guild_cache(current_user["guild_id"])
 
     logger.info(f"Role {role_type} configured by {current_user['username']}")
 
@@ -1051,6 +1057,7 @@ async def delete_role(
     )
     session.add(audit_log)
     session.commit()
+    invalidate_guild_cache(current_user["guild_id"])
 
     logger.info(
         f"Role {role_type} (ID: {role_id}) deleted by {current_user['username']}"
@@ -1088,9 +1095,7 @@ async def update_setting(
     guild.settings[key] = value
 
     # Force SQLAlchemy to detect the change
-    from sqlalchemy.orm import attributes
-
-    attributes.flag_modified(guild, "settings")
+    flag_modified(guild, "settings")
 
     # Log the action
     audit_log = AuditLog(
@@ -1102,6 +1107,7 @@ async def update_setting(
     )
     session.add(audit_log)
     session.commit()
+    invalidate_guild_cache(current_user["guild_id"])
 
     logger.info(f"Setting {key} updated to {value} by {current_user['username']}")
 
@@ -1157,9 +1163,7 @@ async def update_welcome_message(
     guild.settings["welcome_message_config"] = welcome_config
 
     # Force SQLAlchemy to detect the change
-    from sqlalchemy.orm import attributes
-
-    attributes.flag_modified(guild, "settings")
+    flag_modified(guild, "settings")
 
     # Log the action
     audit_log = AuditLog(
@@ -1171,6 +1175,7 @@ async def update_welcome_message(
     )
     session.add(audit_log)
     session.commit()
+    invalidate_guild_cache(current_user["guild_id"])
 
     logger.info(f"Welcome message configuration updated by {current_user['username']}")
 
@@ -1469,9 +1474,7 @@ async def reset_configuration(
             "set_nickname": True,
             "require_email": False,
         }
-        from sqlalchemy.orm import attributes
-
-        attributes.flag_modified(guild, "settings")
+        flag_modified(guild, "settings")
 
     # Log the action
     audit_log = AuditLog(
@@ -1483,6 +1486,7 @@ async def reset_configuration(
     )
     session.add(audit_log)
     session.commit()
+    invalidate_guild_cache(current_user["guild_id"])
 
     logger.warning(f"Configuration reset by {current_user['username']}")
 
@@ -1547,9 +1551,7 @@ async def toggle_app(
     guild.settings[setting_key] = enabled
 
     # Force SQLAlchemy to detect the change
-    from sqlalchemy.orm import attributes
-
-    attributes.flag_modified(guild, "settings")
+    flag_modified(guild, "settings")
 
     # Log the action
     audit_log = AuditLog(
@@ -1561,6 +1563,7 @@ async def toggle_app(
     )
     session.add(audit_log)
     session.commit()
+    invalidate_guild_cache(current_user["guild_id"])
 
     # Special handling for sync service
     if app_name == "sync":
@@ -1629,9 +1632,7 @@ async def save_command_permissions(
     guild.settings["commands_allowed_roles"] = allowed_roles
 
     # Force SQLAlchemy to detect the change
-    from sqlalchemy.orm import attributes
-
-    attributes.flag_modified(guild, "settings")
+    flag_modified(guild, "settings")
 
     # Log the action
     audit_log = AuditLog(
@@ -1643,6 +1644,7 @@ async def save_command_permissions(
     )
     session.add(audit_log)
     session.commit()
+    invalidate_guild_cache(current_user["guild_id"])
 
     logger.info(
         f"Command permissions updated by {current_user['username']}: {len(allowed_roles)} roles"
@@ -1684,9 +1686,7 @@ async def save_onboarding_fields(
     guild.settings["onboarding_fields"] = fields
 
     # Force SQLAlchemy to detect the change
-    from sqlalchemy.orm import attributes
-
-    attributes.flag_modified(guild, "settings")
+    flag_modified(guild, "settings")
 
     # Log the action
     audit_log = AuditLog(
@@ -1698,6 +1698,7 @@ async def save_onboarding_fields(
     )
     session.add(audit_log)
     session.commit()
+    invalidate_guild_cache(current_user["guild_id"])
 
     logger.info(
         f"Onboarding fields updated by {current_user['username']}: {len(fields)} fields"
@@ -1734,9 +1735,7 @@ async def save_nickname_template(
     guild.settings["nickname_template"] = template
 
     # Force SQLAlchemy to detect the change
-    from sqlalchemy.orm import attributes
-
-    attributes.flag_modified(guild, "settings")
+    flag_modified(guild, "settings")
 
     # Log the action
     audit_log = AuditLog(
@@ -1748,6 +1747,7 @@ async def save_nickname_template(
     )
     session.add(audit_log)
     session.commit()
+    invalidate_guild_cache(current_user["guild_id"])
 
     logger.info(f"Nickname template updated by {current_user['username']}: {template}")
 
@@ -1794,9 +1794,7 @@ async def toggle_notification(
     guild.settings["notifications"][notification_type]["enabled"] = enabled
 
     # Force SQLAlchemy to detect the change
-    from sqlalchemy.orm import attributes
-
-    attributes.flag_modified(guild, "settings")
+    flag_modified(guild, "settings")
 
     # Log the action
     audit_log = AuditLog(
@@ -1808,6 +1806,7 @@ async def toggle_notification(
     )
     session.add(audit_log)
     session.commit()
+    invalidate_guild_cache(current_user["guild_id"])
 
     logger.info(
         f"Notification {notification_type} {'enabled' if enabled else 'disabled'} by {current_user['username']}"
@@ -1880,9 +1879,7 @@ async def save_notification_channel(
     guild.settings["notifications"][notification_type]["channel_id"] = int(channel_id)
 
     # Force SQLAlchemy to detect the change
-    from sqlalchemy.orm import attributes
-
-    attributes.flag_modified(guild, "settings")
+    flag_modified(guild, "settings")
 
     # Log the action
     audit_log = AuditLog(
@@ -1898,6 +1895,7 @@ async def save_notification_channel(
     )
     session.add(audit_log)
     session.commit()
+    invalidate_guild_cache(current_user["guild_id"])
 
     logger.info(
         f"Notification channel for {notification_type} set to {channel_id} by {current_user['username']}"
@@ -1943,9 +1941,7 @@ async def save_notification_config(
     ] = message_template
 
     # Force SQLAlchemy to detect the change
-    from sqlalchemy.orm import attributes
-
-    attributes.flag_modified(guild, "settings")
+    flag_modified(guild, "settings")
 
     # Log the action
     audit_log = AuditLog(
@@ -1960,6 +1956,7 @@ async def save_notification_config(
     )
     session.add(audit_log)
     session.commit()
+    invalidate_guild_cache(current_user["guild_id"])
 
     logger.info(
         f"Notification config for {notification_type} updated by {current_user['username']}"
@@ -2165,6 +2162,7 @@ async def configure_sync(
 
         session.add(guild)
         session.commit()
+        invalidate_guild_cache(current_user["guild_id"])
 
         # If bot is connected, handle task initialization/shutdown based on enabled state
         bot = request.app.state.bot if hasattr(request.app.state, "bot") else None
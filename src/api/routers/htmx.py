@@ -58,7 +58,7 @@ async def edit_user_form(
     current_user=Depends(get_current_user),
 ):
     """Return edit form for user"""
-    user = session.exec(select(Member).where(Member.id == user_id)).first()
+    user = session.get(Member, user_id)
 
     if not user:
         raise HTTPException(404, "User not found")
@@ -83,7 +83,7 @@ async def update_user(
     current_user=Depends(get_current_user),
 ):
     """Update user and return updated row"""
-    user = session.exec(select(Member).where(Member.id == user_id)).first()
+    user = session.get(Member, user_id)
 
     if not user:
         raise HTTPException(404, "User not found")
@@ -127,7 +127,7 @@ async def delete_user(
     current_user=Depends(get_current_user),
 ):
     """Delete user and return empty response for row removal"""
-    user = session.exec(select(Member).where(Member.id == user_id)).first()
+    user = session.get(Member, user_id)
 
     if not user:
         raise HTTPException(404, "User not found")
@@ -163,7 +163,7 @@ async def reset_onboarding(
     current_user=Depends(get_current_user),
 ):
     """Reset user's onboarding status"""
-    user = session.exec(select(Member).where(Member.id == user_id)).first()
+    user = session.get(Member, user_id)
 
     if not user:
         raise HTTPException(404, "User not found")
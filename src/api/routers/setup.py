@@ -3,7 +3,7 @@
 from fastapi import APIRouter, Request, Depends, HTTPException, Form
 from fastapi.responses import HTMLResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
-from sqlmodel import Session, select
+from sqlmodel import Session
 from pathlib import Path
 from urllib.parse import urlencode
 from datetime import datetime, timedelta
@@ -11,7 +11,8 @@ import logging
 import secrets
 import asyncio
 
-from src.shared.database import get_session
+from src.shared.database import get_session, is_setup_completed
+from src.shared.guild_cache import invalidate_guild_cache
 from src.shared.models import AdminUser, Guild, Channel, Role
 from src.shared.config import encrypt_value, settings
 
@@ -54,17 +55,16 @@ async def start_discord_bot(request: Request, bot_token: str):
         # Don't raise - allow the application to continue
 
 
-def check_setup_allowed(session: Session):
+def check_setup_allowed():
     """Check if setup is allowed (no admins exist)"""
-    admin_exists = session.exec(select(AdminUser).limit(1)).first()
-    if admin_exists:
+    if is_setup_completed():
         raise HTTPException(403, "Setup already completed. Access denied.")
 
 
 @router.get("/", response_class=HTMLResponse)
-async def setup_page(request: Request, session: Session = Depends(get_session)):
+async def setup_page(request: Request):
     """Display setup page if no admins exist"""
-    check_setup_allowed(session)
+    check_setup_allowed()
 
     # Check if user has completed OAuth (check for setup session cookie)
     setup_session_id = request.cookies.get("setup_session")
@@ -97,9 +97,9 @@ async def setup_page(request: Request, session: Session = Depends(get_session)):
 
 
 @router.get("/auth/discord")
-async def setup_discord_login(session: Session = Depends(get_session)):
+async def setup_discord_login():
     """Initiate Discord OAuth flow for setup"""
-    check_setup_allowed(session)
+    check_setup_allowed()
 
     if not settings.discord_client_id:
         raise HTTPException(500, "Discord OAuth not configured")
@@ -140,7 +140,7 @@ async def initialize_setup(
 ):
     """Initialize the bot with first guild and admin"""
     # Double check no admins exist
-    check_setup_allowed(session)
+    check_setup_allowed()
 
     # Verify user has authenticated via Discord OAuth
     setup_session_id = request.cookies.get("setup_session")
@@ -194,6 +194,7 @@ async def initialize_setup(
             session.add(role)
 
         session.commit()
+        invalidate_guild_cache(guild_id)
 
         # Clean up setup session
         if setup_session_id in setup_oauth_sessions:
@@ -219,7 +220,6 @@ async def initialize_setup(
 
 
 @router.get("/check")
-async def check_setup(session: Session = Depends(get_session)):
+async def check_setup():
     """Check if setup is required"""
-    admin_exists = session.exec(select(AdminUser).limit(1)).first()
-    return {"setup_required": not admin_exists}
+    return {"setup_required": not is_setup_completed()}
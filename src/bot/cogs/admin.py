@@ -5,7 +5,7 @@ from discord.ext import commands
 from discord import app_commands
 import logging
 import sys
-from src.shared.database import get_session
+from src.shared.database import open_session
 from src.shared.models import Member, AdminUser, AuditLog
 from src.bot.permissions import require_command_permission, command_permission_check
 from sqlmodel import select
@@ -21,7 +21,7 @@ class AdminCog(commands.Cog):
 
     def is_admin(self, user_id: int, guild_id: int) -> bool:
         """Check if user is an admin"""
-        with next(get_session()) as session:
+        with open_session() as session:
             admin = session.exec(
                 select(AdminUser).where(
                     AdminUser.discord_id == user_id, AdminUser.guild_id == guild_id
@@ -32,7 +32,7 @@ class AdminCog(commands.Cog):
     async def remove_member(self, member: discord.Member):
         """Remove member from database and reset nickname"""
         try:
-            with next(get_session()) as session:
+            with open_session() as session:
                 # Remove from database
                 db_member = session.exec(
                     select(Member).where(
@@ -105,7 +105,7 @@ class AdminCog(commands.Cog):
             )
             return
 
-        with next(get_session()) as session:
+        with open_session() as session:
             # Get member statistics
             total_members = session.exec(
                 select(Member).where(Member.guild_id == interaction.guild.id)
@@ -135,7 +135,7 @@ class AdminCog(commands.Cog):
             )
             return
 
-        with next(get_session()) as session:
+        with open_session() as session:
             members = session.exec(
                 select(Member).where(Member.guild_id == interaction.guild.id)
             ).all()
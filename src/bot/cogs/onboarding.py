@@ -5,8 +5,9 @@ from discord.ext import commands
 from discord import app_commands
 import logging
 from datetime import datetime
-from src.shared.database import get_session
-from src.shared.models import Member, Role, AuditLog
+from src.shared.database import open_session
+from src.shared.models import Member, Role
+from src.bot.tasks.audit import queue_audit_log
 from src.bot.permissions import require_command_permission, command_permission_check
 from sqlmodel import select
 
@@ -26,7 +27,7 @@ class OnboardingCog(commands.Cog):
         nickname = f"{firstname} {lastname}"
 
         try:
-            with next(get_session()) as session:
+            with open_session() as session:
                 # Update database
                 db_member = session.exec(
                     select(Member).where(
@@ -42,7 +43,7 @@ class OnboardingCog(commands.Cog):
                     session.commit()
 
                     # Log the action
-                    audit_log = AuditLog(
+                    queue_audit_log(
                         guild_id=member.guild.id,
                         user_id=member.id,
                         discord_username=member.name,
@@ -53,8 +54,6 @@ class OnboardingCog(commands.Cog):
                             "nickname": nickname,
                         },
                     )
-                    session.add(audit_log)
-                    session.commit()
 
             # Update Discord nickname
             await member.edit(nick=nickname)
@@ -68,7 +67,7 @@ class OnboardingCog(commands.Cog):
     async def complete_onboarding(self, member: discord.Member):
         """Mark member as onboarded and assign role"""
         try:
-            with next(get_session()) as session:
+            with open_session() as session:
                 # Update member status
                 db_member = session.exec(
                     select(Member).where(
@@ -89,15 +88,13 @@ class OnboardingCog(commands.Cog):
                 ).first()
 
                 # Log the action
-                audit_log = AuditLog(
+                queue_audit_log(
                     guild_id=member.guild.id,
                     user_id=member.id,
                     discord_username=member.name,
                     action="onboarding_completed",
                     details={"status": "completed"},
                 )
-                session.add(audit_log)
-                session.commit()
 
             # Assign role if configured
             if onboarded_role:
@@ -117,7 +114,7 @@ class OnboardingCog(commands.Cog):
     async def cmd_reinit(self, ctx: commands.Context):
         """Re-initialize a user in the database"""
         try:
-            with next(get_session()) as session:
+            with open_session() as session:
                 # Check if member exists
                 db_member = session.exec(
                     select(Member).where(
@@ -166,7 +163,7 @@ class OnboardingCog(commands.Cog):
     ):
         """Slash command for onboarding"""
         # Check if already onboarded
-        with next(get_session()) as session:
+        with open_session() as session:
             db_member = session.exec(
                 select(Member).where(
                     Member.user_id == interaction.user.id,
@@ -4,21 +4,44 @@ import discord
 from discord.ext import commands
 import logging
 import asyncio
+from datetime import datetime
 from typing import Optional
 from src.shared.config import settings, decrypt_value
-from src.shared.database import init_database, get_session
+from src.shared.database import init_database, open_session, run_in_session
+from src.shared.guild_cache import get_cached_settings, warm_guild_cache
 from src.shared.models import Guild, Member
-from sqlmodel import select
-
-# Setup logging
-logging.basicConfig(
-    filename="vela.log",
-    level=getattr(logging, settings.log_level),
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-)
+from sqlmodel import Session, select
+
 logger = logging.getLogger(__name__)
 
 
+def _record_member_join(
+    session: Session,
+    user_id: int,
+    guild_id: int,
+    username: str,
+    joined_at: Optional[datetime],
+) -> bool:
+    """Add a member record on join, returning False if one already exists"""
+    existing_member = session.exec(
+        select(Member.id).where(Member.user_id == user_id, Member.guild_id == guild_id)
+    ).first()
+    if existing_member:
+        return False
+
+    session.add(
+        Member(
+            user_id=user_id,
+            guild_id=guild_id,
+            username=username,
+            join_datetime=joined_at,
+            onboarding_status=0,
+        )
+    )
+    session.commit()
+    return True
+
+
 class VelaBot(commands.Bot):
     """Custom bot class with persistent views and database integration"""
 
@@ -30,6 +53,11 @@ class VelaBot(commands.Bot):
         self.guild_id: Optional[int] = None
         self.db_initialized = False
         self.sync_task = None
+        self.audit_batcher = None
+        self.dm_queue: "asyncio.Queue[tuple[discord.abc.User, str]]" = asyncio.Queue(
+            maxsize=1000
+        )
+        self.dm_task: Optional[asyncio.Task] = None
 
     async def setup_hook(self) -> None:
         """Setup persistent views and load cogs"""
@@ -41,10 +69,38 @@ class VelaBot(commands.Bot):
             OnboardingApprovalView()
         )  # Add approval view for persistent handling
 
+        # Deliver queued DMs in the background
+        self.dm_task = asyncio.create_task(self._dm_worker())
+
+        # Start batching audit log writes before any handler can queue one
+        await self.start_audit_batcher()
+
         # Load all cogs
         await self.load_cogs()
         logger.info("Bot setup completed")
 
+    def queue_dm(self, user: discord.abc.User, message: str):
+        """Queue a direct message so callers don't wait on delivery"""
+        if self.dm_queue.full():
+            # Drop the oldest message rather than block the caller
+            dropped_user, _ = self.dm_queue.get_nowait()
+            self.dm_queue.task_done()
+            logger.warning(f"DM queue full, dropped message for {dropped_user}")
+        self.dm_queue.put_nowait((user, message))
+
+    async def _dm_worker(self):
+        """Send queued direct messages one at a time"""
+        while True:
+            user, message = await self.dm_queue.get()
+            try:
+                await user.send(message)
+            except (discord.Forbidden, discord.HTTPException):
+                logger.info(f"Could not send DM to {user.name} (DMs might be disabled)")
+            except Exception as e:
+                logger.error(f"Error sending DM to {user.name}: {e}")
+            finally:
+                self.dm_queue.task_done()
+
     async def load_cogs(self):
         """Load all bot cogs"""
         cogs = [
@@ -67,7 +123,7 @@ class VelaBot(commands.Bot):
 
         # Initialize database if not already done
         if not self.db_initialized:
-            self.db_initialized = init_database()
+            self.db_initialized = await asyncio.to_thread(init_database)
             if not self.db_initialized:
                 logger.warning("Database not initialized - first run setup required")
                 print(
@@ -83,6 +139,13 @@ class VelaBot(commands.Bot):
         except Exception as e:
             logger.error(f"Failed to sync commands: {e}")
 
+        # Load each guild's settings and approver roles before the first
+        # interaction, so button handlers answer from memory
+        try:
+            await asyncio.gather(*(warm_guild_cache(g.id) for g in self.guilds))
+        except Exception as e:
+            logger.error(f"Failed to warm guild cache: {e}")
+
         # Start sync task if database is initialized
         if self.db_initialized:
             await self.start_sync_task()
@@ -97,7 +160,7 @@ class VelaBot(commands.Bot):
 
         # Only add onboarding buttons if onboarding app is enabled
         view = None
-        with next(get_session()) as session:
+        with open_session() as session:
             guild = session.exec(
                 select(Guild).where(Guild.guild_id == guild_id)
             ).first()
@@ -106,7 +169,7 @@ class VelaBot(commands.Bot):
                 and guild.settings
                 and guild.settings.get("onboarding_enabled", True)
             ):
-                view = OnboardingView(guild_id=guild_id)
+                view = OnboardingView(guild_id=guild_id, guild_settings=guild.settings)
 
         # Default configuration
         default_config = {
@@ -197,7 +260,7 @@ class VelaBot(commands.Bot):
                 return False, "Channel not found", None
 
             # Get guild configuration from database
-            with next(get_session()) as session:
+            with open_session() as session:
                 db_guild = session.exec(
                     select(Guild).where(Guild.guild_id == guild_id)
                 ).first()
@@ -250,7 +313,7 @@ class VelaBot(commands.Bot):
                 return False, "Bot doesn't have permission to access this message"
 
             # Get guild configuration
-            with next(get_session()) as session:
+            with open_session() as session:
                 db_guild = session.exec(
                     select(Guild).where(Guild.guild_id == guild_id)
                 ).first()
@@ -329,73 +392,69 @@ class VelaBot(commands.Bot):
     ):
         """Send a notification based on configuration"""
         try:
-            with next(get_session()) as session:
-                # Get guild configuration
-                guild_record = session.exec(
-                    select(Guild).where(Guild.guild_id == member.guild.id)
-                ).first()
-
-                if not guild_record or not guild_record.settings:
-                    return
-
-                # Check if notifications app is globally enabled
-                if not guild_record.settings.get("notifications_enabled", False):
-                    logger.debug(
-                        f"Notifications app is disabled for guild {member.guild.id}"
-                    )
-                    return
-
-                # Get notification configuration
-                notifications = guild_record.settings.get("notifications", {})
-                notification_config = notifications.get(notification_type, {})
+            # Get guild configuration
+            guild_settings = await get_cached_settings(member.guild.id)
+            if not guild_settings:
+                return
 
-                # Check if this specific notification type is enabled
-                if not notification_config.get("enabled", False):
-                    return
+            # Check if notifications app is globally enabled
+            if not guild_settings.get("notifications_enabled", False):
+                logger.debug(
+                    f"Notifications app is disabled for guild {member.guild.id}"
+                )
+                return
 
-                # Get channel ID
-                channel_id = notification_config.get("channel_id")
-                if not channel_id:
-                    logger.warning(
-                        f"Notification {notification_type} enabled but no channel configured"
-                    )
-                    return
+            # Get notification configuration
+            notifications = guild_settings.get("notifications", {})
+            notification_config = notifications.get(notification_type, {})
 
-                # Get channel
-                channel = member.guild.get_channel(int(channel_id))
-                if not channel:
-                    logger.error(
-                        f"Notification channel {channel_id} not found in guild {member.guild.id}"
-                    )
-                    return
+            # Check if this specific notification type is enabled
+            if not notification_config.get("enabled", False):
+                return
 
-                # Get message template
-                message_template = notification_config.get(
-                    "message_template", f"Event: {notification_type}"
+            # Get channel ID
+            channel_id = notification_config.get("channel_id")
+            if not channel_id:
+                logger.warning(
+                    f"Notification {notification_type} enabled but no channel configured"
                 )
+                return
 
-                # Build context for template replacement
-                template_context = {
-                    "mention": member.mention,
-                    "username": member.name,
-                    "user_id": str(member.id),
-                    "guild_name": member.guild.name,
-                    "nickname": member.nick or member.name,
-                }
-
-                # Add any additional context passed to the function
-                template_context.update(context)
+            # Get channel
+            channel = member.guild.get_channel(int(channel_id))
+            if not channel:
+                logger.error(
+                    f"Notification channel {channel_id} not found in guild {member.guild.id}"
+                )
+                return
 
-                # Replace placeholders in message
-                message = message_template
-                for key, value in template_context.items():
-                    message = message.replace(f"{{{key}}}", str(value))
+            # Get message template
+            message_template = notification_config.get(
+                "message_template", f"Event: {notification_type}"
+            )
 
-                # Send notification
-                await channel.send(message)
-                logger.info(
-                    f"Sent {notification_type} notification for {member.name} in {member.guild.name}"
-                )
+            # Build context for template replacement
+            template_context = {
+                "mention": member.mention,
+                "username": member.name,
+                "user_id": str(member.id),
+                "guild_name": member.guild.name,
+                "nickname": member.nick or member.name,
+            }
+
+            # Add any additional context passed to the function
+            template_context.update(context)
+
+            # Replace placeholders in message
+            message = message_template
+            for key, value in template_context.items():
+                message = message.replace(f"{{{key}}}", str(value))
+
+            # Send notification
+            await channel.send(message)
+            logger.info(
+                f"Sent {notification_type} notification for {member.name} in {member.guild.name}"
+            )
 
         except Exception as e:
             logger.error(f"Error sending notification {notification_type}: {e}")
@@ -403,28 +462,17 @@ class VelaBot(commands.Bot):
     async def on_member_join(self, member: discord.Member):
         """Handle new member joining"""
         try:
-            with next(get_session()) as session:
-                # Check if member already exists in database
-                existing_member = session.exec(
-                    select(Member).where(
-                        Member.user_id == member.id, Member.guild_id == member.guild.id
-                    )
-                ).first()
-
-                if not existing_member:
-                    # Add new member to database
-                    new_member = Member(
-                        user_id=member.id,
-                        guild_id=member.guild.id,
-                        username=member.name,
-                        join_datetime=member.joined_at,
-                        onboarding_status=0,
-                    )
-                    session.add(new_member)
-                    session.commit()
-                    logger.info(f"Member {member.name} joined {member.guild.name}")
-                else:
-                    logger.info(f"Member {member.name} rejoined {member.guild.name}")
+            is_new = await run_in_session(
+                _record_member_join,
+                member.id,
+                member.guild.id,
+                member.name,
+                member.joined_at,
+            )
+            if is_new:
+                logger.info(f"Member {member.name} joined {member.guild.name}")
+            else:
+                logger.info(f"Member {member.name} rejoined {member.guild.name}")
 
             # Send member join notification (works for both new and rejoined members)
             await self.send_notification("member_join", member)
@@ -458,11 +506,48 @@ class VelaBot(commands.Bot):
         except Exception as e:
             logger.error(f"Error stopping sync task: {e}")
 
+    async def start_audit_batcher(self):
+        """Start the audit log batch writer"""
+        try:
+            from src.bot.tasks.audit import AuditLogBatcher
+
+            if not self.audit_batcher:
+                self.audit_batcher = AuditLogBatcher()
+                await self.audit_batcher.start()
+        except Exception as e:
+            logger.error(f"Failed to start audit log batcher: {e}")
+
+    async def stop_audit_batcher(self):
+        """Stop the audit log batch writer, flushing queued entries"""
+        try:
+            if self.audit_batcher:
+                await self.audit_batcher.stop()
+                self.audit_batcher = None
+        except Exception as e:
+            logger.error(f"Error stopping audit log batcher: {e}")
+
     async def close(self):
         """Cleanup bot resources on shutdown"""
-        # Stop sync task before closing
-        await self.stop_sync_task()
-        await super().close()
+        # wait_for_shutdown gives close() 3 seconds in total, so keep the
+        # steps below well inside that and always close the gateway, even
+        # if the caller's timeout cancels us part-way through
+        try:
+            # Stop background tasks before closing
+            await self.stop_sync_task()
+            await self.stop_audit_batcher()
+            if self.dm_task:
+                # Give queued DMs a bounded chance to go out before cancelling
+                try:
+                    await asyncio.wait_for(self.dm_queue.join(), timeout=1.5)
+                except asyncio.TimeoutError:
+                    logger.warning(
+                        "Gave up on undelivered DMs on shutdown "
+                        f"({self.dm_queue.qsize()} still queued)"
+                    )
+        finally:
+            if self.dm_task:
+                self.dm_task.cancel()
+            await super().close()
 
 
 async def run_bot():
@@ -472,7 +557,7 @@ async def run_bot():
     # Get bot token from database or environment
     token = None
 
-    with next(get_session()) as session:
+    with open_session() as session:
         # Try to get token from the first active guild
         guild = session.exec(select(Guild).where(Guild.is_active).limit(1)).first()
 
@@ -507,6 +592,12 @@ async def run_bot():
 
 def main():
     """Main entry point for the bot"""
+    # Configure logging only when run standalone; src.main sets up its own
+    logging.basicConfig(
+        filename="vela.log",
+        level=getattr(logging, settings.log_level),
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
     asyncio.run(run_bot())
 
 
@@ -5,7 +5,7 @@ from discord import app_commands
 from discord.ext import commands
 import logging
 from typing import Union, Optional
-from src.shared.database import get_session
+from src.shared.database import open_session
 from src.shared.models import Guild
 from sqlmodel import select
 
@@ -38,7 +38,7 @@ def check_command_permissions(
         return True, None
 
     try:
-        with next(get_session()) as session:
+        with open_session() as session:
             # Get guild settings
             guild = session.exec(
                 select(Guild).where(Guild.guild_id == guild_id)
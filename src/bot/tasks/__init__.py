@@ -1,5 +1,6 @@
 """Background tasks for the bot"""
 
 from .sync import SyncTask
+from .audit import AuditLogBatcher, queue_audit_log
 
-__all__ = ["SyncTask"]
+__all__ = ["SyncTask", "AuditLogBatcher", "queue_audit_log"]
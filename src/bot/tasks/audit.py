@@ -0,0 +1,145 @@
+"""Background task for batching audit log writes"""
+
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Set
+from sqlmodel import Session
+from src.shared.database import open_session, run_in_session
+from src.shared.models import AuditLog
+
+logger = logging.getLogger(__name__)
+
+# Flush when this many rows are pending or this many seconds have passed
+BATCH_SIZE = 50
+FLUSH_INTERVAL = 0.5
+
+# Rows waiting for the batcher; None tells its loop to stop
+audit_queue: "asyncio.Queue[Optional[Dict[str, Any]]]" = asyncio.Queue()
+
+# The batcher that is draining audit_queue, if one is running
+_active_batcher: Optional["AuditLogBatcher"] = None
+
+# Direct writes in flight while no batcher is running
+_direct_writes: Set[asyncio.Task] = set()
+
+
+def queue_audit_log(**fields: Any) -> None:
+    """Queue an audit log entry to be written by the next batch insert.
+
+    When no batcher is running (before the bot has started it or after it
+    has stopped) the entry is written on its own instead, so it isn't left
+    in the queue.
+    """
+    # Build the row now so the timestamp reflects when the action happened
+    row = AuditLog(**fields).model_dump(exclude={"id"})
+    if _active_batcher is not None:
+        audit_queue.put_nowait(row)
+        return
+
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        # Called from a worker thread; it can write directly
+        with open_session() as session:
+            _insert_audit_rows(session, [row])
+        return
+
+    task = loop.create_task(_write_audit_rows([row]))
+    _direct_writes.add(task)
+    task.add_done_callback(_direct_writes.discard)
+
+
+def _insert_audit_rows(session: Session, rows: List[Dict[str, Any]]) -> None:
+    session.execute(AuditLog.__table__.insert(), rows)
+    session.commit()
+
+
+async def _write_audit_rows(rows: List[Dict[str, Any]]) -> None:
+    """Write rows in a worker thread, logging (not raising) on failure"""
+    try:
+        await run_in_session(_insert_audit_rows, rows)
+    except Exception as e:
+        logger.error("Failed to write %d audit log entries: %s", len(rows), e)
+
+
+class AuditLogBatcher:
+    """
+    Drains queued audit log entries and writes them with a single
+    executemany insert per batch instead of one commit per entry.
+    """
+
+    def __init__(self):
+        self.running = False
+        self.task: Optional[asyncio.Task] = None
+        self.pending: List[Dict[str, Any]] = []
+
+    async def start(self):
+        """Start the audit log batcher"""
+        global _active_batcher
+        if self.running:
+            logger.warning("Audit log batcher already running")
+            return
+
+        self.running = True
+        _active_batcher = self
+        self.task = asyncio.create_task(self._run_loop())
+        logger.info("Audit log batcher started")
+
+    async def stop(self):
+        """Stop the batcher after it has written every entry queued so far"""
+        global _active_batcher
+        if not self.running:
+            return
+
+        # Later entries are written directly; the loop works through the
+        # queue up to the stop marker and exits after its last flush
+        self.running = False
+        if _active_batcher is self:
+            _active_batcher = None
+        audit_queue.put_nowait(None)
+        if self.task:
+            try:
+                await self.task
+            except Exception as e:
+                logger.error("Audit log batcher failed: %s", e)
+
+        # Write anything the loop didn't get to if it stopped early
+        while not audit_queue.empty():
+            row = audit_queue.get_nowait()
+            if row is not None:
+                self.pending.append(row)
+        await self._flush()
+        logger.info("Audit log batcher stopped")
+
+    async def _flush(self):
+        """Write the pending rows, logging (not raising) on failure"""
+        rows, self.pending = self.pending, []
+        if rows:
+            await _write_audit_rows(rows)
+
+    async def _run_loop(self):
+        """Main loop for the batcher"""
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            # Wait for the first row, then collect more until the batch
+            # fills up or the flush interval elapses
+            row = await audit_queue.get()
+            if row is None:
+                break
+            self.pending.append(row)
+            deadline = loop.time() + FLUSH_INTERVAL
+            while len(self.pending) < BATCH_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    row = await asyncio.wait_for(audit_queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if row is None:
+                    stopping = True
+                    break
+                self.pending.append(row)
+
+            await self._flush()
@@ -2,16 +2,35 @@
 
 import asyncio
 import logging
+from collections import Counter
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
 import discord
-from sqlmodel import Session, select
-from src.shared.database import get_session
+from sqlmodel import Session, select, func
+from src.shared.database import open_session, run_in_session
+from src.bot.tasks.audit import queue_audit_log
 from src.shared.models import Guild, Member, Channel, AuditLog
 
 logger = logging.getLogger(__name__)
 
 
+def _find_audit_actor(
+    session: Session, guild_id: int, user_id: int, action: str, user_id_key: str
+) -> Optional[str]:
+    """Find who performed an approval/denial from the audit log, or None"""
+    audit_log = session.exec(
+        select(AuditLog).where(
+            AuditLog.guild_id == guild_id,
+            AuditLog.action == action,  # Changed from action_type to action
+        )
+    ).all()
+
+    for log in audit_log:
+        if log.details and log.details.get(user_id_key) == str(user_id):
+            return log.discord_username or "Unknown"
+    return None
+
+
 class SyncTask:
     """
     Periodically checks for Discord messages that may be out of sync
@@ -23,12 +42,12 @@ class SyncTask:
         self.running = False
         self.task: Optional[asyncio.Task] = None
         self.last_run: Optional[datetime] = None
-        self.stats = {
-            "total_runs": 0,
-            "messages_checked": 0,
-            "messages_updated": 0,
-            "errors": 0,
-        }
+        self.stats = Counter(
+            total_runs=0,
+            messages_checked=0,
+            messages_updated=0,
+            errors=0,
+        )
 
     async def start(self):
         """Start the sync background task"""
@@ -77,7 +96,7 @@ class SyncTask:
 
     async def _is_enabled(self) -> bool:
         """Check if sync is enabled globally"""
-        with next(get_session()) as session:
+        with open_session() as session:
             # Check any guild has sync enabled
             guilds = session.exec(select(Guild).where(Guild.is_active)).all()
             for guild in guilds:
@@ -87,20 +106,26 @@ class SyncTask:
 
     async def _get_interval(self) -> int:
         """Get the sync interval in minutes"""
-        with next(get_session()) as session:
-            # Get the first active guild's interval setting
-            guilds = session.exec(select(Guild).where(Guild.is_active)).all()
-            for guild in guilds:
-                if guild.settings and guild.settings.get("sync_enabled", False):
-                    return guild.settings.get("sync_interval_minutes", 15)
-        return 15  # Default to 15 minutes
+        with open_session() as session:
+            # Use the shortest interval across all guilds with sync enabled;
+            # guilds without an explicit interval count as the 15 minute default
+            interval = session.exec(
+                select(
+                    func.min(
+                        func.coalesce(
+                            Guild.settings["sync_interval_minutes"].as_integer(), 15
+                        )
+                    )
+                ).where(Guild.is_active, Guild.settings["sync_enabled"].as_boolean())
+            ).first()
+        return interval or 15  # Default to 15 minutes
 
     async def sync_all_guilds(self):
         """Run sync for all guilds with the feature enabled"""
         self.last_run = datetime.utcnow()
-        self.stats["total_runs"] += 1
+        errors = 0
 
-        with next(get_session()) as session:
+        with open_session() as session:
             guilds = session.exec(select(Guild).where(Guild.is_active)).all()
 
             for guild in guilds:
@@ -113,7 +138,9 @@ class SyncTask:
                     logger.error(
                         f"Error reconciling guild {guild.guild_id}: {e}", exc_info=True
                     )
-                    self.stats["errors"] += 1
+                    errors += 1
+
+        self.stats.update(total_runs=1, errors=errors)
 
     async def sync_guild(self, guild_id: int):
         """sync approval messages for a specific guild"""
@@ -125,7 +152,7 @@ class SyncTask:
             logger.warning(f"Guild {guild_id} not found in bot cache")
             return
 
-        with next(get_session()) as session:
+        with open_session() as session:
             # Get the approval channel
             approval_channel = session.exec(
                 select(Channel).where(
@@ -156,6 +183,7 @@ class SyncTask:
 
         # Fetch recent messages
         messages_to_check = []
+        checked = 0
         after_time = datetime.utcnow() - timedelta(hours=lookback_hours)
 
         try:
@@ -170,7 +198,7 @@ class SyncTask:
                     # Look for approval request embeds
                     if "Onboarding Approval Request" in (embed.title or ""):
                         messages_to_check.append(message)
-                        self.stats["messages_checked"] += 1
+                        checked += 1
 
         except discord.Forbidden:
             logger.error(f"No permission to read messages in channel {channel.id}")
@@ -181,11 +209,16 @@ class SyncTask:
 
         logger.info(f"Found {len(messages_to_check)} approval messages to check")
 
-        # Check each message
+        # Check each message, collecting counts locally and flushing them once
+        run_stats = Counter(messages_checked=checked)
         for message in messages_to_check:
-            await self._sync_message(message, guild_id)
+            await self._sync_message(message, guild_id, run_stats)
 
-    async def _sync_message(self, message: discord.Message, guild_id: int):
+        self.stats.update(run_stats)
+
+    async def _sync_message(
+        self, message: discord.Message, guild_id: int, run_stats: Counter
+    ):
         """sync a single approval message with database state"""
         try:
             # Extract user ID from the embed
@@ -195,7 +228,7 @@ class SyncTask:
                 return
 
             # Check database state
-            with next(get_session()) as session:
+            with open_session() as session:
                 member = session.exec(
                     select(Member).where(
                         Member.guild_id == guild_id,
@@ -209,14 +242,14 @@ class SyncTask:
 
                 # Check if already processed but message not updated
                 if member.onboarding_status == 1:  # Approved
-                    await self._update_approved_message(message, member, session)
+                    await self._update_approved_message(message, member, run_stats)
                 elif member.onboarding_status == -1:  # Denied
-                    await self._update_denied_message(message, member, session)
+                    await self._update_denied_message(message, member, run_stats)
                 # If status is 0 (pending), leave the message as is
 
         except Exception as e:
             logger.error(f"Error reconciling message {message.id}: {e}", exc_info=True)
-            self.stats["errors"] += 1
+            run_stats["errors"] += 1
 
     def _extract_user_id_from_embed(self, embed: discord.Embed) -> Optional[int]:
         """Extract user ID from approval request embed"""
@@ -243,7 +276,10 @@ class SyncTask:
         return None
 
     async def _update_approved_message(
-        self, message: discord.Message, member: Member, session: Session
+        self,
+        message: discord.Message,
+        member: Member,
+        run_stats: Counter,
     ):
         """Update a message to show approved status"""
         try:
@@ -254,21 +290,14 @@ class SyncTask:
                 return
 
             # Find who approved from audit log
-            approver_info = "System (sync)"
-            audit_log = session.exec(
-                select(AuditLog).where(
-                    AuditLog.guild_id == member.guild_id,
-                    AuditLog.action
-                    == "onboarding_approved",  # Changed from action_type to action
-                )
-            ).all()
-
-            for log in audit_log:
-                if log.details and log.details.get("approved_user_id") == str(
-                    member.user_id
-                ):
-                    approver_info = log.discord_username or "Unknown"
-                    break
+            approver_info = await run_in_session(
+                _find_audit_actor,
+                member.guild_id,
+                member.user_id,
+                "onboarding_approved",
+                "approved_user_id",
+            )
+            approver_info = approver_info or "System (sync)"
 
             # Create updated embed
             new_embed = discord.Embed(
@@ -297,10 +326,10 @@ class SyncTask:
             # Update the message with disabled buttons
             await message.edit(embed=new_embed, view=None)
             logger.info(f"Updated message {message.id} to show approved status")
-            self.stats["messages_updated"] += 1
+            run_stats["messages_updated"] += 1
 
             # Log the sync
-            sync_log = AuditLog(
+            queue_audit_log(
                 guild_id=member.guild_id,
                 user_id=member.user_id,
                 discord_username=member.nickname or "Unknown",
@@ -311,15 +340,16 @@ class SyncTask:
                     "sync_time": datetime.utcnow().isoformat(),
                 },
             )
-            session.add(sync_log)
-            session.commit()
 
         except Exception as e:
             logger.error(f"Error updating approved message {message.id}: {e}")
-            self.stats["errors"] += 1
+            run_stats["errors"] += 1
 
     async def _update_denied_message(
-        self, message: discord.Message, member: Member, session: Session
+        self,
+        message: discord.Message,
+        member: Member,
+        run_stats: Counter,
     ):
         """Update a message to show denied status"""
         try:
@@ -330,21 +360,14 @@ class SyncTask:
                 return
 
             # Find who denied from audit log
-            denier_info = "System (sync)"
-            audit_log = session.exec(
-                select(AuditLog).where(
-                    AuditLog.guild_id == member.guild_id,
-                    AuditLog.action
-                    == "onboarding_denied",  # Changed from action_type to action
-                )
-            ).all()
-
-            for log in audit_log:
-                if log.details and log.details.get("denied_user_id") == str(
-                    member.user_id
-                ):
-                    denier_info = log.discord_username or "Unknown"
-                    break
+            denier_info = await run_in_session(
+                _find_audit_actor,
+                member.guild_id,
+                member.user_id,
+                "onboarding_denied",
+                "denied_user_id",
+            )
+            denier_info = denier_info or "System (sync)"
 
             # Create updated embed
             new_embed = discord.Embed(
@@ -373,10 +396,10 @@ class SyncTask:
             # Update the message with disabled buttons
             await message.edit(embed=new_embed, view=None)
             logger.info(f"Updated message {message.id} to show denied status")
-            self.stats["messages_updated"] += 1
+            run_stats["messages_updated"] += 1
 
             # Log the sync
-            sync_log = AuditLog(
+            queue_audit_log(
                 guild_id=member.guild_id,
                 user_id=member.user_id,
                 discord_username=member.nickname or "Unknown",
@@ -387,12 +410,10 @@ class SyncTask:
                     "sync_time": datetime.utcnow().isoformat(),
                 },
             )
-            session.add(sync_log)
-            session.commit()
 
         except Exception as e:
             logger.error(f"Error updating denied message {message.id}: {e}")
-            self.stats["errors"] += 1
+            run_stats["errors"] += 1
 
     async def trigger_manual_run(
         self, guild_id: Optional[int] = None
@@ -1,360 +1,605 @@
 """Onboarding views with buttons and modals"""
 
+import asyncio
 import discord
 from discord import Interaction
 import logging
-from datetime import datetime
-from src.shared.database import get_session
-from src.shared.models import Member, Role, AuditLog, Guild, Channel
-from sqlmodel import select
+import re
+from datetime import datetime, timezone
+from typing import Optional, Tuple
+from src.shared.config import settings
+from src.shared.database import engine, run_in_session, upsert_insert
+from src.bot.tasks.audit import queue_audit_log
+from src.shared.guild_cache import (
+    get_cached_settings,
+    get_cached_onboarded_role_id,
+    get_cached_approval_channel_id,
+    get_cached_approver_role_ids,
+)
+from src.shared.models import Member
+from sqlalchemy import cast, func, lambda_stmt, or_
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlmodel import Session, select, update
 
 logger = logging.getLogger(__name__)
 
+# Matches {field_name} placeholders in nickname templates
+_TEMPLATE_PLACEHOLDER_RE = re.compile(r"\{([^{}]+)\}")
+
+# Caps concurrent onboarding DB work at the connection pool size so bursts
+# queue here instead of starving the pool
+_onboard_sem = asyncio.Semaphore(settings.db_pool_size)
+
+
+def _save_onboarding_submission(
+    session: Session,
+    user_id: int,
+    guild_id: int,
+    username: str,
+    joined_at: Optional[datetime],
+    field_values: dict,
+    nickname: str,
+    approval_mode: str,
+    submitted_at: datetime,
+) -> None:
+    """Persist a submitted onboarding modal"""
+    # Update member information with collected field values
+    # Store standard fields if they exist
+    values = {}
+    if "first_name" in field_values:
+        values["firstname"] = field_values["first_name"]
+    if "last_name" in field_values:
+        values["lastname"] = field_values["last_name"]
+    if "email" in field_values:
+        values["email"] = field_values["email"]
+
+    # Store all field values in extra_data for custom fields
+    values["extra_data"] = {"onboarding_fields": field_values}
+    values["nickname"] = nickname
+    values["last_change_datetime"] = submitted_at
+
+    if approval_mode == "manual":
+        # Manual approval mode - set status to pending (0 or -1)
+        values["onboarding_status"] = 0
+    else:
+        # Auto approval mode - set status to approved
+        values["onboarding_status"] = 1
+        values["onboarding_completed_at"] = submitted_at
+
+    # Create or update the member record in a single statement
+    stmt = upsert_insert(Member).values(
+        user_id=user_id,
+        guild_id=guild_id,
+        username=username,
+        join_datetime=joined_at,
+        **values,
+    )
 
-def create_onboarding_modal(guild_id: int):
-    """Factory function to create a dynamic onboarding modal based on guild settings"""
-
-    # Fetch guild settings to get configured fields
-    with next(get_session()) as session:
-        guild = session.exec(select(Guild).where(Guild.guild_id == guild_id)).first()
+    # extra_data can hold other keys, so on conflict replace only its
+    # onboarding_fields entry instead of the whole document
+    existing, submitted = Member.__table__.c.extra_data, stmt.excluded.extra_data
+    if engine.dialect.name == "postgresql":
+        existing, submitted = cast(existing, JSONB), cast(submitted, JSONB)
+        old_fields = existing["onboarding_fields"]
+        new_fields = submitted["onboarding_fields"]
+        merged_extra_data = func.coalesce(existing, func.jsonb_build_object()).op("||")(
+            func.jsonb_build_object("onboarding_fields", new_fields)
+        )
+    else:
+        old_fields = func.json_extract(existing, "$.onboarding_fields")
+        new_fields = func.json_extract(submitted, "$.onboarding_fields")
+        merged_extra_data = func.json_set(
+            func.coalesce(existing, func.json_object()),
+            "$.onboarding_fields",
+            func.json(new_fields),
+        )
 
-        # Get configured fields from settings, or use defaults
-        if guild and guild.settings and "onboarding_fields" in guild.settings:
-            fields_config = guild.settings["onboarding_fields"]
-        else:
-            # Default fields if none configured
-            fields_config = [
-                {
-                    "name": "first_name",
-                    "label": "First Name",
-                    "placeholder": "John",
-                    "max_length": 50,
-                    "required": True,
-                },
-                {
-                    "name": "last_name",
-                    "label": "Last Name",
-                    "placeholder": "Doe",
-                    "max_length": 50,
-                    "required": True,
-                },
-            ]
-
-        # Get nickname template
-        nickname_template = None
-        if guild and guild.settings and "nickname_template" in guild.settings:
-            nickname_template = guild.settings["nickname_template"]
-
-    # Create modal class dynamically
-    class DynamicOnboardingModal(discord.ui.Modal, title="Complete Onboarding"):
-        """Dynamically generated modal for collecting user information"""
-
-        def __init__(self):
-            super().__init__()
-            self.guild_id = guild_id
-            self.fields_config = fields_config
-            self.nickname_template = nickname_template
-            self.field_inputs = {}
-
-            # Dynamically add text inputs based on configuration
-            for field_config in fields_config:
-                text_input = discord.ui.TextInput(
-                    style=discord.TextStyle.short,
-                    label=field_config["label"],
-                    placeholder=field_config.get("placeholder", ""),
-                    required=field_config.get("required", True),
-                    max_length=field_config.get("max_length", 100),
-                    min_length=1 if field_config.get("required", True) else 0,
-                )
-                # Store reference to access values later
-                self.field_inputs[field_config["name"]] = text_input
-                self.add_item(text_input)
+    # Only update when a re-submission actually changes something, so
+    # last_change_datetime keeps the time of the last real change
+    changed = [old_fields.is_distinct_from(new_fields)]
+    for name in values:
+        if name in ("extra_data", "last_change_datetime", "onboarding_completed_at"):
+            continue
+        column, new_value = Member.__table__.c[name], stmt.excluded[name]
+        changed.append(column.is_distinct_from(new_value))
+
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id", "guild_id"],
+        set_={**values, "extra_data": merged_extra_data},
+        where=or_(*changed),
+    )
+    session.execute(stmt)
+    session.commit()
 
-        async def on_submit(self, interaction: Interaction):
-            """Handle modal submission"""
-            try:
-                # Collect all field values
-                field_values = {}
-                for field_name, text_input in self.field_inputs.items():
-                    field_values[field_name] = text_input.value
-
-                # Generate nickname from template or default
-                if self.nickname_template:
-                    nickname = self.nickname_template
-                    for field_name, field_value in field_values.items():
-                        nickname = nickname.replace(f"{{{field_name}}}", field_value)
-                    # Truncate to Discord's 32 character limit
-                    nickname = nickname[:32]
-                else:
-                    # Default: use first_name and last_name if available
-                    first_name = field_values.get("first_name", "")
-                    last_name = field_values.get("last_name", "")
-                    if first_name and last_name:
-                        nickname = f"{first_name} {last_name}"[:32]
-                    else:
-                        # Use first available field value
-                        nickname = (
-                            list(field_values.values())[0][:32]
-                            if field_values
-                            else interaction.user.name
-                        )
 
-                onboarded_role_id = None
-                guild_settings = {}
+def _get_onboarding_status(session: Session, user_id: int, guild_id: int) -> int:
+    """Get a member's onboarding status, or 0 if they have no record"""
+    onboarding_status = session.execute(
+        lambda_stmt(
+            lambda: select(Member.onboarding_status).where(
+                Member.user_id == user_id,
+                Member.guild_id == guild_id,
+            )
+        )
+    ).scalar()
+    return onboarding_status or 0
+
+
+def _resolve_pending(session: Session, user_id: int, guild_id: int, **values) -> bool:
+    """Update a member's pending onboarding request, returning False if none
+
+    The status check is part of the UPDATE, so when two approvers click at
+    once only the first one changes the row.
+    """
+    result = session.execute(
+        update(Member)
+        .where(
+            Member.user_id == user_id,
+            Member.guild_id == guild_id,
+            Member.onboarding_status == 0,
+        )
+        .values(**values)
+    )
+    return result.rowcount > 0
+
+
+def _approve_onboarding(
+    session: Session, user_id: int, guild_id: int, approved_at: datetime
+) -> Tuple[bool, Optional[str]]:
+    """Approve a pending member, returning (approved, nickname)"""
+    if not _resolve_pending(
+        session,
+        user_id,
+        guild_id,
+        onboarding_status=1,
+        onboarding_completed_at=approved_at,
+    ):
+        return False, None
+
+    nickname = session.execute(
+        lambda_stmt(
+            lambda: select(Member.nickname).where(
+                Member.user_id == user_id,
+                Member.guild_id == guild_id,
+            )
+        )
+    ).scalar()
+    session.commit()
+
+    return True, nickname
+
+
+def _deny_onboarding(session: Session, user_id: int, guild_id: int) -> bool:
+    """Deny a pending member, returning False if there was no pending request"""
+    # Update member status to denied (-1)
+    if not _resolve_pending(session, user_id, guild_id, onboarding_status=-1):
+        return False
+    session.commit()
+
+    return True
+
+
+async def _resolve_member(
+    guild: discord.Guild, user_id: int
+) -> Optional[discord.Member]:
+    """Get a guild member from the cache, fetching it from Discord on a miss"""
+    member = guild.get_member(user_id)
+    if member:
+        return member
+
+    try:
+        return await guild.fetch_member(user_id)
+    except discord.NotFound:
+        # The user has left the guild
+        return None
+    except discord.HTTPException as e:
+        logger.warning("Failed to fetch member %s: %s", user_id, e)
+        return None
+
+
+class DynamicOnboardingModal(discord.ui.Modal, title="Complete Onboarding"):
+    """Dynamically generated modal for collecting user information"""
+
+    def __init__(
+        self,
+        guild_id: int,
+        fields_config: list,
+        nickname_template: Optional[str] = None,
+        guild_settings: Optional[dict] = None,
+    ):
+        super().__init__()
+        self.guild_id = guild_id
+        self.fields_config = fields_config
+        self.nickname_template = nickname_template
+        self.guild_settings = guild_settings or {}
+        self.field_inputs = {}
+        # Display names for the approval embed, worked out once per modal
+        self.field_titles = {
+            field_config["name"]: field_config["name"].replace("_", " ").title()
+            for field_config in fields_config
+        }
 
-                with next(get_session()) as session:
-                    # Get or create member record
-                    db_member = session.exec(
-                        select(Member).where(
-                            Member.user_id == interaction.user.id,
-                            Member.guild_id == interaction.guild.id,
-                        )
-                    ).first()
-
-                    if not db_member:
-                        db_member = Member(
-                            user_id=interaction.user.id,
-                            guild_id=interaction.guild.id,
-                            username=interaction.user.name,
-                            join_datetime=interaction.user.joined_at,
-                        )
-                        session.add(db_member)
-
-                    # Update member information with collected field values
-                    # Store standard fields if they exist
-                    if "first_name" in field_values:
-                        db_member.firstname = field_values["first_name"]
-                    if "last_name" in field_values:
-                        db_member.lastname = field_values["last_name"]
-                    if "email" in field_values:
-                        db_member.email = field_values["email"]
-
-                    # Store all field values in extra_data for custom fields
-                    if db_member.extra_data is None:
-                        db_member.extra_data = {}
-                    db_member.extra_data["onboarding_fields"] = field_values
-
-                    db_member.nickname = nickname
-                    db_member.last_change_datetime = datetime.utcnow()
-
-                    # Force SQLAlchemy to detect the change to extra_data
-                    from sqlalchemy.orm import attributes
-
-                    attributes.flag_modified(db_member, "extra_data")
-
-                    # Get guild settings
-                    guild = session.exec(
-                        select(Guild).where(Guild.guild_id == interaction.guild.id)
-                    ).first()
-                    if guild and guild.settings:
-                        guild_settings = guild.settings
-
-                    # Check approval mode
-                    approval_mode = guild_settings.get(
-                        "onboarding_approval_mode", "auto"
-                    )
+        # Dynamically add text inputs based on configuration
+        for field_config in fields_config:
+            text_input = discord.ui.TextInput(
+                style=discord.TextStyle.short,
+                label=field_config["label"],
+                placeholder=field_config.get("placeholder", ""),
+                required=field_config.get("required", True),
+                max_length=field_config.get("max_length", 100),
+                min_length=1 if field_config.get("required", True) else 0,
+            )
+            # Store reference to access values later
+            self.field_inputs[field_config["name"]] = text_input
+            self.add_item(text_input)
 
-                    if approval_mode == "manual":
-                        # Manual approval mode - set status to pending (0 or -1)
-                        db_member.onboarding_status = 0
-                    else:
-                        # Auto approval mode - set status to approved
-                        db_member.onboarding_status = 1
-                        db_member.onboarding_completed_at = datetime.utcnow()
+    async def on_submit(self, interaction: Interaction):
+        """Handle modal submission"""
+        # Acknowledge within Discord's 3s window before any DB work
+        await interaction.response.defer(ephemeral=True, thinking=True)
 
-                    session.commit()
+        try:
+            # Collect all field values
+            field_values = {}
+            for field_name, text_input in self.field_inputs.items():
+                field_values[field_name] = text_input.value
+
+            # Generate nickname from template or default
+            if self.nickname_template:
+                # Substitute every {field} placeholder in a single pass,
+                # leaving unknown placeholders untouched
+                nickname = _TEMPLATE_PLACEHOLDER_RE.sub(
+                    lambda m: field_values.get(m.group(1), m.group(0)),
+                    self.nickname_template,
+                )
+                # Truncate to Discord's 32 character limit
+                nickname = nickname[:32]
+            else:
+                # Default: use first_name and last_name if available
+                first_name = field_values.get("first_name", "")
+                last_name = field_values.get("last_name", "")
+                if first_name and last_name:
+                    nickname = f"{first_name} {last_name}"[:32]
+                else:
+                    # Use first available field value, falling back to the
+                    # username when it is missing or left blank
+                    first_value = next(iter(field_values.values()), None)
+                    nickname = (first_value or interaction.user.name)[:32]
+
+            # Settings were read when the modal was created
+            guild_settings = self.guild_settings
+            approval_mode = guild_settings.get("onboarding_approval_mode", "auto")
+
+            # One timestamp for the whole submission; columns store naive UTC
+            now = datetime.now(timezone.utc)
+            submitted_at = now.replace(tzinfo=None)
+
+            # Save the member in a worker thread so the event loop is not blocked
+            async with _onboard_sem:
+                await run_in_session(
+                    _save_onboarding_submission,
+                    user_id=interaction.user.id,
+                    guild_id=interaction.guild.id,
+                    username=interaction.user.name,
+                    joined_at=interaction.user.joined_at,
+                    field_values=field_values,
+                    nickname=nickname,
+                    approval_mode=approval_mode,
+                    submitted_at=submitted_at,
+                )
+            queue_audit_log(
+                timestamp=submitted_at,
+                guild_id=interaction.guild.id,
+                user_id=interaction.user.id,
+                discord_username=interaction.user.name,
+                action="onboarding_modal_completed",
+                details={"nickname": nickname, "fields": field_values},
+            )
 
-                    # Get onboarded role (retrieve ID while session is open)
-                    onboarded_role = session.exec(
-                        select(Role).where(
-                            Role.guild_id == interaction.guild.id,
-                            Role.role_type == "onboarded",
-                        )
-                    ).first()
-
-                    if onboarded_role:
-                        onboarded_role_id = onboarded_role.role_id
-
-                    # Log the action
-                    audit_log = AuditLog(
-                        guild_id=interaction.guild.id,
-                        user_id=interaction.user.id,
-                        discord_username=interaction.user.name,
-                        action="onboarding_modal_completed",
-                        details={"nickname": nickname, "fields": field_values},
-                    )
-                    session.add(audit_log)
-                    session.commit()
-
-                # Handle based on approval mode
-                if approval_mode == "manual":
-                    # Send approval request to the approval channel
-                    with next(get_session()) as approval_session:
-                        approval_channel = approval_session.exec(
-                            select(Channel).where(
-                                Channel.guild_id == interaction.guild.id,
-                                Channel.channel_type == "onboarding_approval",
-                            )
-                        ).first()
-
-                        if approval_channel:
-                            try:
-                                channel = interaction.guild.get_channel(
-                                    approval_channel.channel_id
-                                )
-                                if channel:
-                                    # Create approval embed
-                                    embed = discord.Embed(
-                                        title="📋 Onboarding Approval Request",
-                                        description=f"**{interaction.user.mention}** ({interaction.user.name}) has submitted an onboarding request.",
-                                        color=discord.Color.orange(),
-                                        timestamp=datetime.utcnow(),
-                                    )
-
-                                    # Add field values
-                                    embed.add_field(
-                                        name="Nickname", value=nickname, inline=True
-                                    )
-                                    embed.add_field(
-                                        name="User ID",
-                                        value=str(interaction.user.id),
-                                        inline=True,
-                                    )
-
-                                    # Add custom fields
-                                    for field_name, field_value in field_values.items():
-                                        embed.add_field(
-                                            name=field_name.replace("_", " ").title(),
-                                            value=field_value,
-                                            inline=True,
-                                        )
-
-                                    embed.set_thumbnail(
-                                        url=interaction.user.display_avatar.url
-                                    )
-                                    embed.set_footer(
-                                        text=f"Submitted by {interaction.user.name}"
-                                    )
-
-                                    # Create approve/deny buttons view (we'll create this below)
-                                    approval_view = OnboardingApprovalView(
-                                        interaction.user.id, interaction.guild.id
-                                    )
-
-                                    # Send the approval request
-                                    await channel.send(embed=embed, view=approval_view)
-
-                                    logger.info(
-                                        f"Sent approval request for {interaction.user.name} to channel {channel.name}"
-                                    )
-                                else:
-                                    logger.warning(
-                                        f"Approval channel {approval_channel.channel_id} not found"
-                                    )
-                            except Exception as e:
-                                logger.error(
-                                    f"Error sending approval request: {e}",
-                                    exc_info=True,
-                                )
-
-                    # Notify user that their request is pending
-                    await interaction.response.send_message(
+            # Handle based on approval mode
+            if approval_mode == "manual":
+                # Send the approval request and notify the user that their
+                # request is pending; the two messages are independent
+                await asyncio.gather(
+                    self._send_approval_request(
+                        interaction, nickname, field_values, now
+                    ),
+                    interaction.followup.send(
                         f"✅ Thanks for submitting your onboarding request, {nickname}!\n"
                         "Your request is pending approval. You'll be notified once it's reviewed.",
                         ephemeral=True,
-                    )
+                    ),
+                )
+
+                logger.info(
+                    "User %s submitted onboarding request (pending approval)",
+                    interaction.user.name,
+                )
 
+            else:
+                # Auto approval mode - process immediately
+                onboarded_role_id = await get_cached_onboarded_role_id(
+                    interaction.guild.id
+                )
+
+                # Nickname and role updates are independent Discord calls,
+                # so issue them concurrently
+                updates = {}
+                if guild_settings.get("set_nickname", True):
+                    updates["nickname"] = interaction.user.edit(nick=nickname)
+
+                if guild_settings.get("auto_role", True) and onboarded_role_id:
+                    role = interaction.guild.get_role(onboarded_role_id)
+                    if role:
+                        updates["role"] = interaction.user.add_roles(role)
+                    else:
+                        logger.warning(
+                            "✗ Onboarded role %s not found in guild %s",
+                            onboarded_role_id,
+                            interaction.guild.id,
+                        )
+                else:
                     logger.info(
-                        f"User {interaction.user.name} submitted onboarding request (pending approval)"
+                        "No onboarded role configured or auto_role disabled for guild %s",
+                        interaction.guild.id,
                     )
 
-                else:
-                    # Auto approval mode - process immediately
-                    # Update Discord nickname if enabled (with error handling)
-                    if guild_settings.get("set_nickname", True):
-                        try:
-                            await interaction.user.edit(nick=nickname)
-                            logger.info(
-                                f"✓ Updated nickname for {interaction.user.name} to {nickname}"
-                            )
-                        except discord.Forbidden:
+                results = await asyncio.gather(
+                    *updates.values(), return_exceptions=True
+                )
+                for update_name, result in zip(updates, results):
+                    if update_name == "nickname":
+                        if isinstance(result, discord.Forbidden):
                             logger.warning(
-                                f"Missing permission to change nickname for {interaction.user.name}"
+                                "Missing permission to change nickname for %s",
+                                interaction.user.name,
                             )
-                        except Exception as e:
+                        elif isinstance(result, Exception):
                             logger.warning(
-                                f"Could not update nickname for {interaction.user.name}: {e}"
+                                "Could not update nickname for %s: %s",
+                                interaction.user.name,
+                                result,
                             )
-
-                    # Add role if configured and enabled (with error handling)
-                    if guild_settings.get("auto_role", True) and onboarded_role_id:
-                        logger.info(
-                            f"Attempting to add role {onboarded_role_id} to {interaction.user.name}"
-                        )
-                        try:
-                            role = interaction.guild.get_role(onboarded_role_id)
-                            if role:
-                                await interaction.user.add_roles(role)
-                                logger.info(
-                                    f"✓ Successfully added role {role.name} to {interaction.user.name}"
-                                )
-                            else:
-                                logger.warning(
-                                    f"✗ Onboarded role {onboarded_role_id} not found in guild {interaction.guild.id}"
-                                )
-                        except discord.Forbidden as e:
+                        else:
+                            logger.info(
+                                "✓ Updated nickname for %s to %s",
+                                interaction.user.name,
+                                nickname,
+                            )
+                    else:
+                        if isinstance(result, discord.Forbidden):
                             logger.warning(
-                                f"✗ Missing permission to add role to {interaction.user.name}: {e}"
+                                "✗ Missing permission to add role to %s: %s",
+                                interaction.user.name,
+                                result,
                             )
-                        except Exception as e:
+                        elif isinstance(result, Exception):
                             logger.error(
-                                f"✗ Could not add role to {interaction.user.name}: {e}",
-                                exc_info=True,
+                                "✗ Could not add role to %s: %s",
+                                interaction.user.name,
+                                result,
+                                exc_info=result,
                             )
-                    else:
-                        logger.info(
-                            f"No onboarded role configured or auto_role disabled for guild {interaction.guild.id}"
+                        else:
+                            logger.info(
+                                "✓ Successfully added role %s to %s",
+                                role.name,
+                                interaction.user.name,
+                            )
+
+                await interaction.followup.send(
+                    f"✅ Thanks for completing onboarding, {nickname}!\n"
+                    "If you have any questions, don't hesitate to reach out!",
+                    ephemeral=True,
+                )
+
+                logger.info(
+                    "User %s completed onboarding as %s",
+                    interaction.user.name,
+                    nickname,
+                )
+
+        except Exception as e:
+            logger.error("Error in onboarding modal: %s", e, exc_info=True)
+            await interaction.followup.send(
+                "❌ An error occurred during onboarding. Please try again or contact an administrator.",
+                ephemeral=True,
+            )
+
+    async def _send_approval_request(
+        self,
+        interaction: Interaction,
+        nickname: str,
+        field_values: dict,
+        submitted_at: datetime,
+    ):
+        """Post the submission to the guild's approval channel, if configured"""
+        approval_channel_id = await get_cached_approval_channel_id(interaction.guild.id)
+        if approval_channel_id:
+            try:
+                channel = interaction.guild.get_channel(approval_channel_id)
+                if channel:
+                    # Create approval embed
+                    embed = discord.Embed(
+                        title="📋 Onboarding Approval Request",
+                        description=f"**{interaction.user.mention}** ({interaction.user.name}) has submitted an onboarding request.",
+                        color=discord.Color.orange(),
+                        timestamp=submitted_at,
+                    )
+
+                    # Add field values
+                    embed.add_field(name="Nickname", value=nickname, inline=True)
+                    embed.add_field(
+                        name="User ID",
+                        value=str(interaction.user.id),
+                        inline=True,
+                    )
+
+                    # Add custom fields
+                    for field_name, field_value in field_values.items():
+                        embed.add_field(
+                            name=self.field_titles[field_name],
+                            value=field_value,
+                            inline=True,
                         )
 
-                    await interaction.response.send_message(
-                        f"✅ Thanks for completing onboarding, {nickname}!\n"
-                        "If you have any questions, don't hesitate to reach out!",
-                        ephemeral=True,
+                    embed.set_thumbnail(url=interaction.user.display_avatar.url)
+                    embed.set_footer(text=f"Submitted by {interaction.user.name}")
+
+                    # Create approve/deny buttons view (we'll create this below)
+                    approval_view = OnboardingApprovalView(
+                        interaction.user.id, interaction.guild.id
                     )
 
+                    # Send the approval request
+                    await channel.send(embed=embed, view=approval_view)
+
                     logger.info(
-                        f"User {interaction.user.name} completed onboarding as {nickname}"
+                        "Sent approval request for %s to channel %s",
+                        interaction.user.name,
+                        channel.name,
                     )
-
+                else:
+                    logger.warning("Approval channel %s not found", approval_channel_id)
             except Exception as e:
-                logger.error(f"Error in onboarding modal: {e}", exc_info=True)
-                await interaction.response.send_message(
-                    "❌ An error occurred during onboarding. Please try again or contact an administrator.",
-                    ephemeral=True,
+                logger.error(
+                    "Error sending approval request: %s",
+                    e,
+                    exc_info=True,
                 )
 
-        async def on_error(self, interaction: Interaction, error: Exception):
-            """Handle errors in the modal"""
-            logger.error(f"Onboarding modal error: {error}")
+    async def on_error(self, interaction: Interaction, error: Exception):
+        """Handle errors in the modal"""
+        logger.error("Onboarding modal error: %s", error)
+        if interaction.response.is_done():
+            await interaction.followup.send(
+                "An error occurred. Please try again.", ephemeral=True
+            )
+        else:
             await interaction.response.send_message(
                 "An error occurred. Please try again.", ephemeral=True
             )
 
-    return DynamicOnboardingModal()
+
+async def create_onboarding_modal(guild_id: int):
+    """Factory function to create a dynamic onboarding modal based on guild settings"""
+
+    # Fetch guild settings to get configured fields
+    guild_settings = await get_cached_settings(guild_id)
+
+    # Get configured fields from settings, or use defaults
+    if "onboarding_fields" in guild_settings:
+        fields_config = guild_settings["onboarding_fields"]
+    else:
+        # Default fields if none configured
+        fields_config = [
+            {
+                "name": "first_name",
+                "label": "First Name",
+                "placeholder": "John",
+                "max_length": 50,
+                "required": True,
+            },
+            {
+                "name": "last_name",
+                "label": "Last Name",
+                "placeholder": "Doe",
+                "max_length": 50,
+                "required": True,
+            },
+        ]
+
+    # Get nickname template
+    nickname_template = guild_settings.get("nickname_template")
+
+    return DynamicOnboardingModal(
+        guild_id, fields_config, nickname_template, guild_settings
+    )
+
+
+# Help button settings used when a guild has not configured its own
+_DEFAULT_HELP_CONFIG = {
+    "enabled": True,
+    "button_text": "Need Help?",
+    "message_content": "We're here to assist you! If you need help with onboarding or have any questions, please contact a moderator or admin.",
+}
+
+# Static content, built once and shared by every about_button click
+_ABOUT_EMBED = discord.Embed(
+    title="What is Onboarding?",
+    description=(
+        "Welcome to our Discord server! We're thrilled to have you join our community. "
+        "To unlock the full experience and access more parts of the server, "
+        "we ask that you complete the member onboarding process."
+    ),
+    color=discord.Color.blue(),
+)
+
+_ABOUT_EMBED.add_field(
+    name="Why Complete Onboarding?",
+    value=(
+        "Completing the onboarding process grants you:\n"
+        "• Access to additional server channels\n"
+        "• Ability to participate in discussions\n"
+        "• Access to member-only features\n"
+        "• A personalized server experience"
+    ),
+    inline=False,
+)
+
+_ABOUT_EMBED.add_field(
+    name="What Information is Collected?",
+    value=(
+        "• **First and Last Name**: For your server nickname\n"
+        "• **Discord ID**: Your unique identifier\n"
+        "• **Join Date**: When you joined our community\n"
+        "• **Onboarding Status**: Your progress in the server"
+    ),
+    inline=False,
+)
+
+_ABOUT_EMBED.add_field(
+    name="Privacy & Data Usage",
+    value=(
+        "We take your privacy seriously:\n"
+        "• Data is stored securely in our database\n"
+        "• Information is used only for server management\n"
+        "• You can request data removal at any time\n"
+        "• We never share your data with third parties"
+    ),
+    inline=False,
+)
+
+_ABOUT_EMBED.add_field(
+    name="Get Started",
+    value=(
+        "Ready to join? Click the **Complete Onboarding** button to begin!\n"
+        "If you have questions, feel free to reach out to our moderation team."
+    ),
+    inline=False,
+)
+
+_ABOUT_EMBED.set_footer(text="Thank you for joining our community!")
 
 
 class OnboardingView(discord.ui.View):
     """Persistent view with onboarding buttons"""
 
-    def __init__(self, guild_id: int = None):
+    def __init__(self, guild_id: int = None, guild_settings: Optional[dict] = None):
         super().__init__(timeout=None)  # Persistent view
         self.guild_id = guild_id
 
+        # The caller passes the guild's settings in, since a view can't be
+        # built asynchronously; without them the default buttons are shown
+        guild_settings = guild_settings or {}
+
         # Load help button configuration from guild settings
-        self.help_config = self._load_help_config()
+        self.help_config = guild_settings.get(
+            "help_button_config", _DEFAULT_HELP_CONFIG
+        )
 
         # Check if member support app is enabled
-        member_support_enabled = self._is_member_support_enabled()
+        member_support_enabled = guild_settings.get("member_support_enabled", True)
 
         # Only add the help button if both the global app and button config are enabled
         if member_support_enabled and self.help_config.get("enabled", True):
@@ -367,53 +612,6 @@ class OnboardingView(discord.ui.View):
             help_button.callback = self.help_button_callback
             self.add_item(help_button)
 
-    def _is_member_support_enabled(self):
-        """Check if member support app is globally enabled"""
-        if not self.guild_id:
-            return True
-
-        try:
-            with next(get_session()) as session:
-                guild = session.exec(
-                    select(Guild).where(Guild.guild_id == self.guild_id)
-                ).first()
-
-                if guild and guild.settings:
-                    return guild.settings.get("member_support_enabled", True)
-        except Exception as e:
-            logger.error(f"Error checking member support enabled: {e}")
-
-        return True
-
-    def _load_help_config(self):
-        """Load help button configuration from database"""
-        if not self.guild_id:
-            return {"enabled": True}
-
-        try:
-            with next(get_session()) as session:
-                guild = session.exec(
-                    select(Guild).where(Guild.guild_id == self.guild_id)
-                ).first()
-
-                if guild and guild.settings:
-                    return guild.settings.get(
-                        "help_button_config",
-                        {
-                            "enabled": True,
-                            "button_text": "Need Help?",
-                            "message_content": "We're here to assist you! If you need help with onboarding or have any questions, please contact a moderator or admin.",
-                        },
-                    )
-        except Exception as e:
-            logger.error(f"Error loading help button config: {e}")
-
-        return {
-            "enabled": True,
-            "button_text": "Need Help?",
-            "message_content": "We're here to assist you! If you need help with onboarding or have any questions, please contact a moderator or admin.",
-        }
-
     @discord.ui.button(
         label="Complete Onboarding",
         style=discord.ButtonStyle.success,
@@ -422,36 +620,31 @@ class OnboardingView(discord.ui.View):
     )
     async def onboard_button(self, interaction: Interaction, button: discord.ui.Button):
         """Handle onboarding button click"""
-        # Check if user is already onboarded and if prevent_reonboarding is enabled
-        with next(get_session()) as session:
-            # Get guild settings
-            guild = session.exec(
-                select(Guild).where(Guild.guild_id == interaction.guild.id)
-            ).first()
-
-            # Check if onboarding app is enabled
-            if guild and guild.settings:
-                onboarding_enabled = guild.settings.get("onboarding_enabled", True)
-                if not onboarding_enabled:
-                    await interaction.response.send_message(
-                        "⚠️ Onboarding is currently disabled on this server.\n"
-                        "Please contact a server admin if you need assistance.",
-                        ephemeral=True,
-                    )
-                    return
-
-            db_member = session.exec(
-                select(Member).where(
-                    Member.user_id == interaction.user.id,
-                    Member.guild_id == interaction.guild.id,
-                )
-            ).first()
+        # Get guild settings
+        guild_settings = await get_cached_settings(interaction.guild.id)
 
-            prevent_reonboarding = True
-            if guild and guild.settings:
-                prevent_reonboarding = guild.settings.get("prevent_reonboarding", True)
+        # Check if onboarding app is enabled
+        if not guild_settings.get("onboarding_enabled", True):
+            await interaction.response.send_message(
+                "⚠️ Onboarding is currently disabled on this server.\n"
+                "Please contact a server admin if you need assistance.",
+                ephemeral=True,
+            )
+            return
 
-            if prevent_reonboarding and db_member and db_member.onboarding_status > 0:
+        # Check if user is already onboarded and if prevent_reonboarding is enabled
+        if guild_settings.get("prevent_reonboarding", True):
+            # Members holding the onboarded role are done; skip the DB lookup
+            onboarded_role_id = await get_cached_onboarded_role_id(interaction.guild.id)
+            if onboarded_role_id and any(
+                role.id == onboarded_role_id for role in interaction.user.roles
+            ):
+                onboarding_status = 1
+            else:
+                onboarding_status = await run_in_session(
+                    _get_onboarding_status, interaction.user.id, interaction.guild.id
+                )
+            if onboarding_status > 0:
                 await interaction.response.send_message(
                     "✅ You have already completed onboarding!\n"
                     "Contact a server admin if you need adjustments made.",
@@ -460,7 +653,7 @@ class OnboardingView(discord.ui.View):
                 return
 
         # Show the dynamically generated onboarding modal
-        modal = create_onboarding_modal(interaction.guild.id)
+        modal = await create_onboarding_modal(interaction.guild.id)
         await interaction.response.send_modal(modal)
 
     @discord.ui.button(
@@ -471,112 +664,29 @@ class OnboardingView(discord.ui.View):
     )
     async def about_button(self, interaction: Interaction, button: discord.ui.Button):
         """Handle about button click"""
-        embed = discord.Embed(
-            title="What is Onboarding?",
-            description=(
-                "Welcome to our Discord server! We're thrilled to have you join our community. "
-                "To unlock the full experience and access more parts of the server, "
-                "we ask that you complete the member onboarding process."
-            ),
-            color=discord.Color.blue(),
-        )
-
-        embed.add_field(
-            name="Why Complete Onboarding?",
-            value=(
-                "Completing the onboarding process grants you:\n"
-                "• Access to additional server channels\n"
-                "• Ability to participate in discussions\n"
-                "• Access to member-only features\n"
-                "• A personalized server experience"
-            ),
-            inline=False,
-        )
-
-        embed.add_field(
-            name="What Information is Collected?",
-            value=(
-                "• **First and Last Name**: For your server nickname\n"
-                "• **Discord ID**: Your unique identifier\n"
-                "• **Join Date**: When you joined our community\n"
-                "• **Onboarding Status**: Your progress in the server"
-            ),
-            inline=False,
-        )
-
-        embed.add_field(
-            name="Privacy & Data Usage",
-            value=(
-                "We take your privacy seriously:\n"
-                "• Data is stored securely in our database\n"
-                "• Information is used only for server management\n"
-                "• You can request data removal at any time\n"
-                "• We never share your data with third parties"
-            ),
-            inline=False,
-        )
-
-        embed.add_field(
-            name="Get Started",
-            value=(
-                "Ready to join? Click the **Complete Onboarding** button to begin!\n"
-                "If you have questions, feel free to reach out to our moderation team."
-            ),
-            inline=False,
-        )
-
-        embed.set_footer(text="Thank you for joining our community!")
-
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        await interaction.response.send_message(embed=_ABOUT_EMBED, ephemeral=True)
 
     async def help_button_callback(self, interaction: Interaction):
         """Handle help button click"""
         # Load config from the guild that the interaction is from
         try:
-            with next(get_session()) as session:
-                guild = session.exec(
-                    select(Guild).where(Guild.guild_id == interaction.guild.id)
-                ).first()
-
-                # Check if member support app is enabled
-                if guild and guild.settings:
-                    member_support_enabled = guild.settings.get(
-                        "member_support_enabled", True
-                    )
-                    if not member_support_enabled:
-                        await interaction.response.send_message(
-                            "⚠️ Member support is currently disabled on this server.\n"
-                            "Please contact a server admin if you need assistance.",
-                            ephemeral=True,
-                        )
-                        return
-
-                if guild and guild.settings:
-                    help_config = guild.settings.get(
-                        "help_button_config",
-                        {
-                            "enabled": True,
-                            "button_text": "Need Help?",
-                            "message_content": "We're here to assist you! If you need help with onboarding or have any questions, please contact a moderator or admin.",
-                        },
-                    )
-                else:
-                    help_config = {
-                        "enabled": True,
-                        "button_text": "Need Help?",
-                        "message_content": "We're here to assist you! If you need help with onboarding or have any questions, please contact a moderator or admin.",
-                    }
+            settings = await get_cached_settings(interaction.guild.id)
         except Exception as e:
-            logger.error(f"Error loading help button config in callback: {e}")
-            help_config = {
-                "enabled": True,
-                "button_text": "Need Help?",
-                "message_content": "We're here to assist you! If you need help with onboarding or have any questions, please contact a moderator or admin.",
-            }
+            logger.error("Error loading help button config in callback: %s", e)
+            settings = {}
 
+        # Check if member support app is enabled
+        if not settings.get("member_support_enabled", True):
+            await interaction.response.send_message(
+                "⚠️ Member support is currently disabled on this server.\n"
+                "Please contact a server admin if you need assistance.",
+                ephemeral=True,
+            )
+            return
+
+        help_config = settings.get("help_button_config", _DEFAULT_HELP_CONFIG)
         message_content = help_config.get(
-            "message_content",
-            "We're here to assist you! If you need help with onboarding or have any questions, please contact a moderator or admin.",
+            "message_content", _DEFAULT_HELP_CONFIG["message_content"]
         )
 
         await interaction.response.send_message(message_content, ephemeral=True)
@@ -599,42 +709,28 @@ class OnboardingApprovalView(discord.ui.View):
 
     async def check_approver_permission(self, interaction: Interaction) -> bool:
         """Check if the user has permission to approve/deny requests"""
-        with next(get_session()) as session:
-            # Get all approver roles for this guild
-            approver_roles = session.exec(
-                select(Role).where(
-                    Role.guild_id == self.guild_id,
-                    Role.role_type == "onboarding_approver",
-                )
-            ).all()
+        approver_role_ids = await get_cached_approver_role_ids(self.guild_id)
 
-            logger.info(
-                f"Checking approval permission for {interaction.user.name} in guild {self.guild_id}"
-            )
-            logger.info(f"Found {len(approver_roles)} approver roles in database")
-
-            if not approver_roles:
-                logger.warning(
-                    f"No approver roles configured for guild {self.guild_id}"
-                )
-                return False
+        if not approver_role_ids:
+            logger.warning("No approver roles configured for guild %s", self.guild_id)
+            return False
 
-            # Check if user has any of the approver roles
-            approver_role_ids = [role.role_id for role in approver_roles]
-            user_role_ids = [role.id for role in interaction.user.roles]
-
-            logger.info(f"Approver role IDs from DB: {approver_role_ids}")
-            logger.info(f"User's role IDs from Discord: {user_role_ids}")
-            logger.info(
-                f"User's role names: {[role.name for role in interaction.user.roles]}"
-            )
+        # Check if user has any of the approver roles
+        has_permission = not approver_role_ids.isdisjoint(
+            role.id for role in interaction.user.roles
+        )
 
-            has_permission = any(
-                role_id in user_role_ids for role_id in approver_role_ids
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Approval permission for %s in guild %s: %s (approver roles %s, user roles %s)",
+                interaction.user.name,
+                self.guild_id,
+                has_permission,
+                sorted(approver_role_ids),
+                [role.name for role in interaction.user.roles],
             )
-            logger.info(f"Permission check result: {has_permission}")
 
-            return has_permission
+        return has_permission
 
     @discord.ui.button(
         label="Approve",
@@ -686,112 +782,96 @@ class OnboardingApprovalView(discord.ui.View):
         await interaction.response.edit_message(embed=processing_embed, view=self)
 
         try:
-            # Extract values we need from database before session closes
-            member_nickname = None
-            guild_settings = {}
-            onboarded_role_id = None
-
-            with next(get_session()) as session:
-                # Get the member
-                db_member = session.exec(
-                    select(Member).where(
-                        Member.user_id == self.user_id,
-                        Member.guild_id == self.guild_id,
-                    )
-                ).first()
-
-                if not db_member:
-                    # Update the message to show error (we already responded)
-                    error_embed = original_embed.copy()
-                    error_embed.color = discord.Color.red()
-                    error_embed.title = "❌ Member Not Found"
-                    error_embed.add_field(
-                        name="Error",
-                        value="Member not found in database. They may have been removed.",
-                        inline=False,
-                    )
-                    await interaction.message.edit(embed=error_embed, view=self)
-                    return
-
-                # Extract nickname before session closes
-                member_nickname = db_member.nickname
-
-                # Update member status
-                db_member.onboarding_status = 1
-                db_member.onboarding_completed_at = datetime.utcnow()
-
-                # Get guild settings
-                guild = session.exec(
-                    select(Guild).where(Guild.guild_id == self.guild_id)
-                ).first()
-                guild_settings = guild.settings if guild and guild.settings else {}
-
-                # Get onboarded role
-                onboarded_role = session.exec(
-                    select(Role).where(
-                        Role.guild_id == self.guild_id,
-                        Role.role_type == "onboarded",
-                    )
-                ).first()
+            # One timestamp for the whole approval; columns store naive UTC
+            now = datetime.now(timezone.utc)
+            approved_at = now.replace(tzinfo=None)
 
-                # Extract role_id before session closes
-                if onboarded_role:
-                    onboarded_role_id = onboarded_role.role_id
+            async with _onboard_sem:
+                found, member_nickname = await run_in_session(
+                    _approve_onboarding, self.user_id, self.guild_id, approved_at
+                )
 
-                # Log the approval
-                audit_log = AuditLog(
-                    guild_id=self.guild_id,
-                    user_id=interaction.user.id,
-                    discord_username=interaction.user.name,
-                    action="onboarding_approved",
-                    details={
-                        "approved_user_id": self.user_id,
-                        "approved_by": interaction.user.name,
-                    },
+            if not found:
+                # Update the message to show error (we already responded)
+                error_embed = original_embed.copy()
+                error_embed.color = discord.Color.red()
+                error_embed.title = "❌ Request Not Pending"
+                error_embed.add_field(
+                    name="Error",
+                    value="No pending request for this member. It may have already "
+                    "been handled, or the member was removed.",
+                    inline=False,
                 )
-                session.add(audit_log)
-                session.commit()
+                await interaction.message.edit(embed=error_embed, view=self)
+                return
+
+            # Log the approval
+            queue_audit_log(
+                timestamp=approved_at,
+                guild_id=self.guild_id,
+                user_id=interaction.user.id,
+                discord_username=interaction.user.name,
+                action="onboarding_approved",
+                details={
+                    "approved_user_id": self.user_id,
+                    "approved_by": interaction.user.name,
+                },
+            )
+
+            guild_settings = await get_cached_settings(self.guild_id)
+            onboarded_role_id = await get_cached_onboarded_role_id(self.guild_id)
 
             # Get the Discord member
             guild = interaction.guild
-            member = guild.get_member(self.user_id)
+            member = await _resolve_member(guild, self.user_id)
 
             if member:
-                # Update nickname if enabled
+                # Nickname and role updates are independent Discord calls,
+                # so issue them concurrently
+                updates = {}
                 if guild_settings.get("set_nickname", True) and member_nickname:
-                    try:
-                        await member.edit(nick=member_nickname)
-                        logger.info(
-                            f"✓ Updated nickname for {member.name} to {member_nickname}"
-                        )
-                    except discord.Forbidden:
-                        logger.warning(
-                            f"Missing permission to change nickname for {member.name}"
-                        )
-                    except Exception as e:
-                        logger.warning(
-                            f"Could not update nickname for {member.name}: {e}"
-                        )
+                    updates["nickname"] = member.edit(nick=member_nickname)
 
-                # Add role if configured and enabled
+                role = None
                 if guild_settings.get("auto_role", True) and onboarded_role_id:
-                    try:
-                        role = guild.get_role(onboarded_role_id)
-                        if role:
-                            await member.add_roles(role)
-                            logger.info(f"✓ Added role {role.name} to {member.name}")
-                    except Exception as e:
-                        logger.error(f"Could not add role to {member.name}: {e}")
-
-                # Send DM to the user notifying them of approval
-                try:
-                    await member.send(
-                        f"✅ Your onboarding request has been approved! Welcome to {guild.name}!"
-                    )
-                except (discord.Forbidden, discord.HTTPException):
-                    logger.info(
-                        f"Could not send DM to {member.name} (DMs might be disabled)"
-                    )
+                    role = guild.get_role(onboarded_role_id)
+                    if role:
+                        updates["role"] = member.add_roles(role)
+
+                results = await asyncio.gather(
+                    *updates.values(), return_exceptions=True
+                )
+                for update_name, result in zip(updates, results):
+                    if update_name == "nickname":
+                        if isinstance(result, discord.Forbidden):
+                            logger.warning(
+                                "Missing permission to change nickname for %s",
+                                member.name,
+                            )
+                        elif isinstance(result, Exception):
+                            logger.warning(
+                                "Could not update nickname for %s: %s",
+                                member.name,
+                                result,
+                            )
+                        else:
+                            logger.info(
+                                "✓ Updated nickname for %s to %s",
+                                member.name,
+                                member_nickname,
+                            )
+                    elif isinstance(result, Exception):
+                        logger.error(
+                            "Could not add role to %s: %s", member.name, result
+                        )
+                    else:
+                        logger.info("✓ Added role %s to %s", role.name, member.name)
+
+                # Notify the user by DM without holding up the button update
+                interaction.client.queue_dm(
+                    member,
+                    f"✅ Your onboarding request has been approved! Welcome to {guild.name}!",
+                )
 
                 # Send onboarding completion notification
                 try:
@@ -800,7 +880,7 @@ class OnboardingApprovalView(discord.ui.View):
                     )
                 except Exception as e:
                     logger.error(
-                        f"Error sending onboarding completion notification: {e}"
+                        "Error sending onboarding completion notification: %s", e
                     )
 
             # Update the embed to show it's been approved
@@ -812,18 +892,20 @@ class OnboardingApprovalView(discord.ui.View):
                 value=interaction.user.mention,
                 inline=False,
             )
-            original_embed.timestamp = datetime.utcnow()
+            original_embed.timestamp = now
 
             # Buttons are already disabled from earlier
             # Use normal message edit since we already responded to the interaction
             await interaction.message.edit(embed=original_embed, view=self)
 
             logger.info(
-                f"Onboarding request for user {self.user_id} approved by {interaction.user.name}"
+                "Onboarding request for user %s approved by %s",
+                self.user_id,
+                interaction.user.name,
             )
 
         except Exception as e:
-            logger.error(f"Error approving onboarding request: {e}", exc_info=True)
+            logger.error("Error approving onboarding request: %s", e, exc_info=True)
             # Try to update the message to show error state
             try:
                 error_embed = original_embed.copy()
@@ -889,59 +971,50 @@ class OnboardingApprovalView(discord.ui.View):
         await interaction.response.edit_message(embed=processing_embed, view=self)
 
         try:
-            with next(get_session()) as session:
-                # Get the member
-                db_member = session.exec(
-                    select(Member).where(
-                        Member.user_id == self.user_id,
-                        Member.guild_id == self.guild_id,
-                    )
-                ).first()
-
-                if not db_member:
-                    # Update the message to show error (we already responded)
-                    error_embed = original_embed.copy()
-                    error_embed.color = discord.Color.red()
-                    error_embed.title = "❌ Member Not Found"
-                    error_embed.add_field(
-                        name="Error",
-                        value="Member not found in database. They may have been removed.",
-                        inline=False,
-                    )
-                    await interaction.message.edit(embed=error_embed, view=self)
-                    return
+            now = datetime.now(timezone.utc)
 
-                # Update member status to denied (-1)
-                db_member.onboarding_status = -1
+            async with _onboard_sem:
+                found = await run_in_session(
+                    _deny_onboarding, self.user_id, self.guild_id
+                )
 
-                # Log the denial
-                audit_log = AuditLog(
-                    guild_id=self.guild_id,
-                    user_id=interaction.user.id,
-                    discord_username=interaction.user.name,
-                    action="onboarding_denied",
-                    details={
-                        "denied_user_id": self.user_id,
-                        "denied_by": interaction.user.name,
-                    },
+            if not found:
+                # Update the message to show error (we already responded)
+                error_embed = original_embed.copy()
+                error_embed.color = discord.Color.red()
+                error_embed.title = "❌ Request Not Pending"
+                error_embed.add_field(
+                    name="Error",
+                    value="No pending request for this member. It may have already "
+                    "been handled, or the member was removed.",
+                    inline=False,
                 )
-                session.add(audit_log)
-                session.commit()
+                await interaction.message.edit(embed=error_embed, view=self)
+                return
+
+            # Log the denial
+            queue_audit_log(
+                timestamp=now.replace(tzinfo=None),
+                guild_id=self.guild_id,
+                user_id=interaction.user.id,
+                discord_username=interaction.user.name,
+                action="onboarding_denied",
+                details={
+                    "denied_user_id": self.user_id,
+                    "denied_by": interaction.user.name,
+                },
+            )
 
             # Get the Discord member and send DM
             guild = interaction.guild
-            member = guild.get_member(self.user_id)
+            member = await _resolve_member(guild, self.user_id)
 
             if member:
-                try:
-                    await member.send(
-                        f"❌ Your onboarding request for {guild.name} has been denied. "
-                        "Please contact a moderator for more information."
-                    )
-                except (discord.Forbidden, discord.HTTPException):
-                    logger.info(
-                        f"Could not send DM to {member.name} (DMs might be disabled)"
-                    )
+                interaction.client.queue_dm(
+                    member,
+                    f"❌ Your onboarding request for {guild.name} has been denied. "
+                    "Please contact a moderator for more information.",
+                )
 
             # Update the embed to show it's been denied
             # Use the original embed we saved earlier and update it
@@ -952,18 +1025,20 @@ class OnboardingApprovalView(discord.ui.View):
                 value=interaction.user.mention,
                 inline=False,
             )
-            original_embed.timestamp = datetime.utcnow()
+            original_embed.timestamp = now
 
             # Buttons are already disabled from earlier
             # Use normal message edit since we already responded to the interaction
             await interaction.message.edit(embed=original_embed, view=self)
 
             logger.info(
-                f"Onboarding request for user {self.user_id} denied by {interaction.user.name}"
+                "Onboarding request for user %s denied by %s",
+                self.user_id,
+                interaction.user.name,
             )
 
         except Exception as e:
-            logger.error(f"Error denying onboarding request: {e}", exc_info=True)
+            logger.error("Error denying onboarding request: %s", e, exc_info=True)
             # Try to update the message to show error state
             try:
                 error_embed = original_embed.copy()
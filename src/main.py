@@ -1,21 +1,23 @@
 """Main entry point for running both Discord bot and FastAPI server"""
 
 import asyncio
+import atexit
 import logging
 import os
+import queue
 import sys
 import signal
 import uvicorn
-import discord
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
+from typing import Optional
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.bot.main import VelaBot  # noqa: E402
 from src.shared.config import settings  # noqa: E402
-from src.shared.database import init_database, get_session  # noqa: E402
-from src.shared.models import Guild, AdminUser  # noqa: E402
+from src.shared.database import init_database, open_session  # noqa: E402
+from src.shared.models import Guild  # noqa: E402
 from sqlmodel import select  # noqa: E402
 
 # Force unbuffered output for better container/terminal behavior
@@ -28,24 +30,58 @@ class SuppressCancelledErrorFilter(logging.Filter):
         # Suppress CancelledError tracebacks from starlette/uvicorn during shutdown
         if record.exc_info:
             exc_type = record.exc_info[0]
-            if exc_type and exc_type.__name__ == "CancelledError":
+            if exc_type and issubclass(exc_type, asyncio.CancelledError):
                 return False
         return True
 
 
 # Setup logging
 data_dir = os.getenv("DATA_DIR", "./data")
-os.makedirs(data_dir, exist_ok=True)
-
 log_file = os.getenv("LOG_FILE", os.path.join(data_dir, "vela.log"))
 
+log_formatter = logging.Formatter(
+    "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+stream_handler = logging.StreamHandler()
+stream_handler.setFormatter(log_formatter)
+log_handlers = [stream_handler]
+
+# Containers that collect stdout can turn the log file off with LOG_TO_FILE=false
+file_handler = None
+if settings.log_to_file:
+    os.makedirs(os.path.dirname(log_file) or ".", exist_ok=True)
+    file_handler = logging.FileHandler(log_file)
+    file_handler.setFormatter(log_formatter)
+    log_handlers.append(file_handler)
+
+# Loggers only enqueue records; a listener thread does the file and console
+# writes so a slow disk never blocks the event loop
+log_queue = queue.SimpleQueue()
+log_listener = QueueListener(log_queue, *log_handlers)
+log_listener.start()
+atexit.register(log_listener.stop)
+
+# Only merge the message here; the listener's handlers apply the real format
+queue_handler = QueueHandler(log_queue)
+queue_handler.setFormatter(logging.Formatter("%(message)s"))
+
+# force=True replaces any handlers configured before this module ran
 logging.basicConfig(
     level=getattr(logging, settings.log_level),
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[logging.FileHandler(log_file), logging.StreamHandler()],
+    handlers=[queue_handler],
+    force=True,
 )
 logger = logging.getLogger(__name__)
 
+
+def reopen_log_file():
+    """Reopen the log file, e.g. after logrotate has moved it"""
+    old_stream = file_handler.setStream(file_handler._open())
+    if old_stream:
+        old_stream.close()
+    logger.info("Reopened log file %s", log_file)
+
+
 # Add filter to uvicorn and starlette loggers to suppress CancelledError
 for logger_name in ["uvicorn.error", "uvicorn", "starlette"]:
     log = logging.getLogger(logger_name)
@@ -54,11 +90,69 @@ for logger_name in ["uvicorn.error", "uvicorn", "starlette"]:
 # Global bot instance for API access
 bot_instance = None
 
+# Set once to stop both services; created in main() on the running loop
+shutdown_event: Optional[asyncio.Event] = None
+api_server: Optional[uvicorn.Server] = None
+
+# Decrypted bot token, resolved on the first bot start
+_bot_token: Optional[str] = None
+
+
+def _resolve_bot_token() -> Optional[str]:
+    """Get the bot token from the first active guild, falling back to the environment"""
+    with open_session() as session:
+        # Try to get token from the first active guild
+        guild = session.exec(select(Guild).where(Guild.is_active).limit(1)).first()
+
+    if guild and guild.bot_token:
+        try:
+            from src.shared.config import decrypt_value
+
+            token = decrypt_value(guild.bot_token)
+            if token:
+                return token
+        except Exception as e:
+            logger.warning("Failed to decrypt token from database: %s", e)
+            # Fall back to environment variable if decryption fails
+
+    return settings.bot_token
+
+
+async def get_bot_token() -> Optional[str]:
+    """Resolve the bot token once and reuse it if the bot is started again"""
+    global _bot_token
+    if _bot_token:
+        return _bot_token
+
+    token = await asyncio.to_thread(_resolve_bot_token)
+    # Don't cache a missing token so a later start can pick up setup
+    if token and token != "your_bot_token_here":
+        _bot_token = token
+    return token
+
 
 async def run_bot():
     global bot_instance
     """Run the Discord bot"""
     try:
+        # Initialize database; runs alongside the API's startup, which
+        # shares the same one-shot schema creation
+        logger.info("Initializing database...")
+        setup_completed = await asyncio.to_thread(init_database)
+
+        # Only start bot if setup is completed (admin user exists)
+        if not setup_completed:
+            print("\n[WARNING] First-run setup required!")
+            print(
+                f"Please visit http://localhost:{settings.api_port}/setup to complete initial configuration\n"
+            )
+            logger.info("Skipping Discord bot startup - setup not completed")
+            return
+
+        # Import discord.py only once the bot is actually going to run
+        import discord
+        from src.bot.main import VelaBot
+
         bot = VelaBot()
         bot_instance = bot  # Make bot accessible to API
 
@@ -67,24 +161,7 @@ async def run_bot():
 
         fastapi_app.state.bot = bot
 
-        # Get bot token from database or environment
-        token = None
-        with next(get_session()) as session:
-            # Try to get token from the first active guild
-            guild = session.exec(select(Guild).where(Guild.is_active).limit(1)).first()
-
-            if guild and guild.bot_token:
-                try:
-                    from src.shared.config import decrypt_value
-
-                    token = decrypt_value(guild.bot_token)
-                except Exception as e:
-                    logger.warning(f"Failed to decrypt token from database: {e}")
-                    # Fall back to environment variable if decryption fails
-                    token = settings.bot_token
-
-        if not token:
-            token = settings.bot_token
+        token = await get_bot_token()
 
         if not token or token == "your_bot_token_here":
             logger.info(
@@ -93,7 +170,13 @@ async def run_bot():
             return
 
         logger.info("Starting Discord bot...")
-        await bot.start(token)
+        try:
+            await bot.start(token)
+        except discord.LoginFailure:
+            logger.error("Failed to login to Discord: Invalid token")
+            print("[ERROR] Failed to start Discord bot: Invalid or improper token")
+            print("   Please configure a valid bot token via the setup interface")
+            # Don't raise - allow the application to continue running
 
     except asyncio.CancelledError:
         logger.info("Bot task cancelled, closing bot...")
@@ -104,22 +187,20 @@ async def run_bot():
             if not bot_instance.is_closed():
                 await bot_instance.close()
         raise
-    except discord.LoginFailure:
-        logger.error("Failed to login to Discord: Invalid token")
-        print("[ERROR] Failed to start Discord bot: Invalid or improper token")
-        print("   Please configure a valid bot token via the setup interface")
-        # Don't raise - allow the application to continue running
     except Exception as e:
-        logger.error(f"Bot error: {e}")
+        logger.error("Bot error: %s", e)
         print(f"[ERROR] Discord bot error: {e}")
         # Don't raise - allow the application to continue running
 
 
 async def run_api():
     """Run the FastAPI server"""
+    global api_server
     server = None
     try:
-        logger.info(f"Starting API server on {settings.api_host}:{settings.api_port}")
+        logger.info(
+            "Starting API server on %s:%s", settings.api_host, settings.api_port
+        )
 
         # Import app directly to ensure lifespan runs immediately
         from src.api.main import app
@@ -132,11 +213,13 @@ async def run_api():
             reload=settings.debug,
         )
         server = uvicorn.Server(config)
+        api_server = server
 
         # Override uvicorn's signal handlers so we can handle shutdown ourselves
         server.install_signal_handlers = lambda: None
 
         await server.serve()
+        print("Web server stopped", flush=True)
 
     except asyncio.CancelledError:
         logger.info("API server task cancelled, shutting down...")
@@ -144,52 +227,29 @@ async def run_api():
             server.should_exit = True
         raise
     except Exception as e:
-        logger.error(f"API error: {e}")
+        logger.error("API error: %s", e)
         raise
+    finally:
+        # The web server is always running, so once it stops the app is done
+        if shutdown_event:
+            shutdown_event.set()
 
 
-# fmt: off
-# CRITICAL: Do not modify - essential for proper CTRL+C handling
-async def graceful_shutdown(tasks):
-    """Gracefully shutdown all tasks"""
-    logger.info("Starting graceful shutdown...")
-    print("\nShutting down Vela...", flush=True)
-
-    # Cancel all tasks
-    for task in tasks:
-        if not task.done():
-            task.cancel()
-
-    # Wait for tasks to complete with timeout
-    try:
-        await asyncio.wait_for(
-            asyncio.gather(*tasks, return_exceptions=True), timeout=5.0
-        )
-        print("Web server stopped", flush=True)
-    except asyncio.TimeoutError:
-        logger.warning("Some tasks did not complete within timeout")
-        print("Web server stopped (forced)", flush=True)
+async def wait_for_shutdown():
+    """Wait for a shutdown request, then close the Discord bot"""
+    await shutdown_event.wait()
 
-    # Cleanup bot instance
-    global bot_instance
-    if bot_instance:
-        if not bot_instance.is_closed():
-            try:
-                await asyncio.wait_for(bot_instance.close(), timeout=3.0)
-                print("Discord bot stopped", flush=True)
-                logger.info("Discord bot connection closed")
-            except asyncio.TimeoutError:
-                logger.warning("Bot close timed out")
-                print("Discord bot stopped (forced)", flush=True)
-            except Exception as e:
-                logger.error(f"Error closing bot: {e}")
-        else:
-            # Bot already closed during task cancellation
+    # The API server stops on its own once should_exit is set
+    if bot_instance and not bot_instance.is_closed():
+        try:
+            await asyncio.wait_for(bot_instance.close(), timeout=3.0)
             print("Discord bot stopped", flush=True)
-
-    print("Shutdown complete", flush=True)
-    logger.info("Shutdown complete")
-# fmt: on
+            logger.info("Discord bot connection closed")
+        except asyncio.TimeoutError:
+            logger.warning("Bot close timed out")
+            print("Discord bot stopped (forced)", flush=True)
+        except Exception as e:
+            logger.error("Error closing bot: %s", e)
 
 
 async def main():
@@ -203,80 +263,90 @@ async def main():
     """
     )
 
-    # Initialize database
-    logger.info("Initializing database...")
-    init_database()
-
-    # Check if setup has been completed (admin user exists)
-    setup_completed = False
-    with next(get_session()) as session:
-        admin_exists = session.exec(select(AdminUser).limit(1)).first()
-        setup_completed = admin_exists is not None
-
-    if not setup_completed:
-        print("\n[WARNING] First-run setup required!")
-        print(
-            f"Please visit http://localhost:{settings.api_port}/setup to complete initial configuration\n"
-        )
-
-    # Create tasks for both services
-    tasks = []
+    global shutdown_event
+    shutdown_event = asyncio.Event()
+    setup_signal_handlers()
 
-    # Always start the API
-    api_task = asyncio.create_task(run_api())
-    tasks.append(api_task)
+    # Run both services; if either fails the other is cancelled with it
+    try:
+        async with asyncio.TaskGroup() as tg:
+            # Always start the API
+            tg.create_task(run_api())
 
-    # Only start bot if setup is completed
-    bot_task = None
-    if setup_completed:
-        bot_task = asyncio.create_task(run_bot())
-        tasks.append(bot_task)
-    else:
-        logger.info("Skipping Discord bot startup - setup not completed")
+            # The bot checks setup completion itself once the database is ready
+            tg.create_task(run_bot())
 
-    print(f"\n[OK] Web interface available at: http://localhost:{settings.api_port}")
-    print(f"[INFO] API documentation at: http://localhost:{settings.api_port}/docs\n")
-    print("Press Ctrl+C to stop\n")
+            tg.create_task(wait_for_shutdown())
 
-    # Run both services with proper shutdown handling
-    try:
-        await asyncio.gather(*tasks, return_exceptions=False)
-    except (KeyboardInterrupt, asyncio.CancelledError):
-        await graceful_shutdown(tasks)
+            print(
+                f"\n[OK] Web interface available at: http://localhost:{settings.api_port}"
+            )
+            print(
+                f"[INFO] API documentation at: http://localhost:{settings.api_port}/docs\n"
+            )
+            print("Press Ctrl+C to stop\n")
     except Exception as e:
-        logger.error(f"Application error: {e}")
-        await graceful_shutdown(tasks)
+        logger.error("Application error: %s", e)
         raise
 
+    print("Shutdown complete", flush=True)
+    logger.info("Shutdown complete")
+
 
 # fmt: off
-# CRITICAL: Signal handling - do not modify
+# CRITICAL: Signal handling - CTRL+C and SIGTERM must stop both services
 def setup_signal_handlers():
     """Setup signal handlers for graceful shutdown"""
+    loop = asyncio.get_running_loop()
 
     # For Docker containers and Unix systems
     for sig in (signal.SIGTERM, signal.SIGINT):
-        signal.signal(sig, lambda s, f: asyncio.create_task(shutdown_signal_handler()))
-
-
-async def shutdown_signal_handler():
-    """Handle shutdown signals"""
+        try:
+            loop.add_signal_handler(sig, request_shutdown)
+        except NotImplementedError:
+            # Windows event loops don't support add_signal_handler
+            signal.signal(sig, lambda s, f: loop.call_soon_threadsafe(request_shutdown))
+
+    # SIGHUP reopens the log file for log rotation (not available on Windows)
+    if file_handler and hasattr(signal, "SIGHUP"):
+        try:
+            loop.add_signal_handler(signal.SIGHUP, reopen_log_file)
+        except NotImplementedError:
+            pass
+
+
+def request_shutdown():
+    """Handle shutdown signals by asking both services to stop"""
+    if shutdown_event.is_set():
+        return
     logger.info("Received shutdown signal")
-    # Cancel all running tasks
-    tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
-    for task in tasks:
-        task.cancel()
-    await asyncio.gather(*tasks, return_exceptions=True)
+    print("\nShutting down Vela...", flush=True)
+    shutdown_event.set()
+    if api_server:
+        api_server.should_exit = True
 # fmt: on
 
 
+def get_loop_factory():
+    """Return uvloop's event loop factory, or None for asyncio's default loop"""
+    if not settings.use_uvloop or sys.platform == "win32":
+        return None
+    try:
+        import uvloop
+    except ImportError:
+        logger.info("uvloop not installed, using the default asyncio event loop")
+        return None
+    return uvloop.new_event_loop
+
+
 if __name__ == "__main__":
     try:
-        # Run the main application
-        asyncio.run(main())
+        # Run the main application; the bot and API share this loop
+        with asyncio.Runner(loop_factory=get_loop_factory()) as runner:
+            runner.run(main())
     except KeyboardInterrupt:
         print("\nGoodbye!")
     except Exception as e:
-        logger.error(f"Fatal error: {e}")
+        logger.error("Fatal error: %s", e)
         print(f"[ERROR] Fatal error: {e}")
         sys.exit(1)
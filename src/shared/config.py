@@ -1,9 +1,10 @@
 """Configuration management module"""
 
+from functools import lru_cache
 from typing import Optional
 from dotenv import load_dotenv
 from pydantic_settings import BaseSettings
-from cryptography.fernet import Fernet
+from cryptography.fernet import Fernet, MultiFernet
 import logging
 
 logger = logging.getLogger(__name__)
@@ -18,6 +19,16 @@ class Settings(BaseSettings):
     # Database
     database_url: str = "sqlite:///./vela.db"
 
+    # Database connection pool
+    db_pool_size: int = 20
+    db_pool_overflow: int = 10
+    db_pool_timeout: int = 30
+    db_pool_recycle: int = 1800
+    # PostgreSQL only: cancel statements running longer than this (seconds)
+    db_statement_timeout: int = 60
+    # Log queries slower than this (milliseconds)
+    slow_query_ms: int = 250
+
     # Discord OAuth
     discord_client_id: Optional[str] = None
     discord_client_secret: Optional[str] = None
@@ -28,6 +39,9 @@ class Settings(BaseSettings):
     api_port: int = 8000
     api_host: str = "0.0.0.0"
 
+    # Run the event loop on uvloop when installed (ignored on Windows)
+    use_uvloop: bool = True
+
     # Bot Settings (initial values, then managed via DB)
     bot_token: Optional[str] = None
     guild_id: Optional[int] = None
@@ -38,6 +52,7 @@ class Settings(BaseSettings):
     # Logging
     debug: bool = False
     log_level: str = "INFO"
+    log_to_file: bool = True
 
     # Redis (optional)
     redis_url: Optional[str] = None
@@ -47,7 +62,9 @@ class Settings(BaseSettings):
 
     def get_cors_origins(self) -> list[str]:
         """Parse CORS origins from string"""
-        return [origin.strip() for origin in self.cors_origins_str.split(",")]
+        origins = (origin.strip() for origin in self.cors_origins_str.split(","))
+        # Ignore empty entries, e.g. from a trailing comma
+        return [origin for origin in origins if origin]
 
     class Config:
         env_file = ".env"
@@ -59,16 +76,20 @@ class Settings(BaseSettings):
 settings = Settings()
 
 # Initialize encryption
-if not settings.encryption_key:
-    # Generate a new encryption key if not provided
+# ENCRYPTION_KEY may list several comma-separated keys to rotate keys:
+# values are encrypted with the first and decrypted with any of them
+encryption_keys = [
+    key.strip() for key in (settings.encryption_key or "").split(",") if key.strip()
+]
+if not encryption_keys:
+    # Generate a new encryption key if not provided (or only blank entries)
+    if settings.encryption_key:
+        logger.error("ENCRYPTION_KEY contains no keys, ignoring it")
     settings.encryption_key = Fernet.generate_key().decode()
+    encryption_keys = [settings.encryption_key]
     logger.warning("Generated new encryption key. Save this in .env for persistence.")
 
-fernet = Fernet(
-    settings.encryption_key.encode()
-    if isinstance(settings.encryption_key, str)
-    else settings.encryption_key
-)
+fernet = MultiFernet([Fernet(key.encode()) for key in encryption_keys])
 
 
 def encrypt_value(value: str) -> str:
@@ -76,18 +97,23 @@ def encrypt_value(value: str) -> str:
     return fernet.encrypt(value.encode()).decode()
 
 
+@lru_cache(maxsize=256)
 def decrypt_value(encrypted_value: str) -> str:
-    """Decrypt an encrypted string value"""
+    """Decrypt an encrypted string value
+
+    Results are cached by ciphertext. A changed secret is stored as a new
+    ciphertext, so the cache never needs clearing.
+    """
     return fernet.decrypt(encrypted_value.encode()).decode()
 
 
 def get_config_from_db(key: str, guild_id: int) -> Optional[str]:
     """Get configuration value from database"""
-    from src.shared.database import get_session
+    from src.shared.database import open_session
     from src.shared.models import Config
     from sqlmodel import select
 
-    with next(get_session()) as session:
+    with open_session() as session:
         config = session.exec(
             select(Config).where(Config.key == key, Config.guild_id == guild_id)
         ).first()
@@ -99,38 +125,35 @@ def set_config_in_db(
     key: str, value: str, guild_id: int, description: Optional[str] = None
 ):
     """Set configuration value in database"""
-    from src.shared.database import get_session
+    from src.shared.database import open_session, upsert_insert
     from src.shared.models import Config
-    from sqlmodel import select
     from datetime import datetime
 
-    with next(get_session()) as session:
-        config = session.exec(
-            select(Config).where(Config.key == key, Config.guild_id == guild_id)
-        ).first()
-
-        if config:
-            config.value = value
-            config.updated_at = datetime.utcnow()
-            if description:
-                config.description = description
-        else:
-            config = Config(
-                key=key, value=value, guild_id=guild_id, description=description
-            )
-            session.add(config)
-
+    # Keep the existing description unless a new one is given
+    values = {"value": value, "updated_at": datetime.utcnow()}
+    if description:
+        values["description"] = description
+
+    with open_session() as session:
+        # Insert or update in one statement, relying on the (key, guild_id)
+        # unique constraint
+        stmt = (
+            upsert_insert(Config)
+            .values(key=key, guild_id=guild_id, **values)
+            .on_conflict_do_update(index_elements=["key", "guild_id"], set_=values)
+        )
+        session.execute(stmt)
         session.commit()
-        logger.info(f"Configuration updated: {key} for guild {guild_id}")
+        logger.info("Configuration updated: %s for guild %s", key, guild_id)
 
 
 def get_guild_settings(guild_id: int) -> dict:
     """Get all settings for a guild"""
-    from src.shared.database import get_session
+    from src.shared.database import open_session
     from src.shared.models import Guild, Config, Channel, Role
     from sqlmodel import select
 
-    with next(get_session()) as session:
+    with open_session() as session:
         # Get guild info
         guild = session.exec(select(Guild).where(Guild.guild_id == guild_id)).first()
 
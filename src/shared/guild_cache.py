@@ -0,0 +1,137 @@
+"""In-memory TTL cache for per-guild settings and role configuration"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, FrozenSet, Optional, Tuple, TypeVar
+from sqlmodel import Session, select
+from src.shared.database import run_in_session
+from src.shared.models import Channel, Guild, Role
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# How long a cached value stays valid, in seconds
+CACHE_TTL = 60
+CACHE_MAX_SIZE = 1024
+
+# guild_id -> (expires_at, value)
+_settings_cache: Dict[int, Tuple[float, Dict[str, Any]]] = {}
+_onboarded_role_cache: Dict[int, Tuple[float, Optional[int]]] = {}
+_approval_channel_cache: Dict[int, Tuple[float, Optional[int]]] = {}
+_approver_roles_cache: Dict[int, Tuple[float, FrozenSet[int]]] = {}
+
+# Bumped on every invalidation, so a load that was in flight when the
+# guild's data changed doesn't store the stale result
+_generation = 0
+
+
+async def _get_or_load(
+    cache: Dict[int, Tuple[float, T]],
+    guild_id: int,
+    loader: Callable[[Session, int], T],
+) -> T:
+    """Return a cached value for a guild, running the loader in a worker
+    thread on a miss so the query doesn't block the event loop"""
+    entry = cache.get(guild_id)
+    if entry and entry[0] > time.monotonic():
+        return entry[1]
+
+    generation = _generation
+    value = await run_in_session(loader, guild_id)
+    if generation != _generation:
+        return value
+    now = time.monotonic()
+
+    # Drop expired entries before growing past the size limit
+    if len(cache) >= CACHE_MAX_SIZE:
+        for key in [k for k, (exp, _) in cache.items() if exp <= now]:
+            cache.pop(key, None)
+        if len(cache) >= CACHE_MAX_SIZE:
+            cache.clear()
+
+    cache[guild_id] = (now + CACHE_TTL, value)
+    return value
+
+
+def _load_settings(session: Session, guild_id: int) -> Dict[str, Any]:
+    settings = session.exec(
+        select(Guild.settings).where(Guild.guild_id == guild_id)
+    ).first()
+    return dict(settings) if settings else {}
+
+
+def _load_onboarded_role_id(session: Session, guild_id: int) -> Optional[int]:
+    return session.exec(
+        select(Role.role_id).where(
+            Role.guild_id == guild_id, Role.role_type == "onboarded"
+        )
+    ).first()
+
+
+def _load_approval_channel_id(session: Session, guild_id: int) -> Optional[int]:
+    return session.exec(
+        select(Channel.channel_id).where(
+            Channel.guild_id == guild_id,
+            Channel.channel_type == "onboarding_approval",
+        )
+    ).first()
+
+
+def _load_approver_role_ids(session: Session, guild_id: int) -> FrozenSet[int]:
+    return frozenset(
+        session.exec(
+            select(Role.role_id).where(
+                Role.guild_id == guild_id,
+                Role.role_type == "onboarding_approver",
+            )
+        ).all()
+    )
+
+
+async def get_cached_settings(guild_id: int) -> Dict[str, Any]:
+    """Get a guild's settings dict, reading from the database on cache miss.
+
+    The returned dict is shared between callers and must not be mutated.
+    Unknown guilds are cached as an empty dict.
+    """
+    return await _get_or_load(_settings_cache, guild_id, _load_settings)
+
+
+async def get_cached_onboarded_role_id(guild_id: int) -> Optional[int]:
+    """Get the Discord ID of a guild's onboarded role, or None if unset"""
+    return await _get_or_load(_onboarded_role_cache, guild_id, _load_onboarded_role_id)
+
+
+async def get_cached_approval_channel_id(guild_id: int) -> Optional[int]:
+    """Get the Discord ID of a guild's onboarding approval channel, or None"""
+    return await _get_or_load(
+        _approval_channel_cache, guild_id, _load_approval_channel_id
+    )
+
+
+async def get_cached_approver_role_ids(guild_id: int) -> FrozenSet[int]:
+    """Get the Discord IDs of a guild's onboarding approver roles"""
+    return await _get_or_load(_approver_roles_cache, guild_id, _load_approver_role_ids)
+
+
+async def warm_guild_cache(guild_id: int) -> None:
+    """Load all of a guild's cached values ahead of its first interaction"""
+    await asyncio.gather(
+        get_cached_settings(guild_id),
+        get_cached_onboarded_role_id(guild_id),
+        get_cached_approval_channel_id(guild_id),
+        get_cached_approver_role_ids(guild_id),
+    )
+
+
+def invalidate_guild_cache(guild_id: int) -> None:
+    """Drop cached data for a guild after its settings, roles or channels change"""
+    global _generation
+    _generation += 1
+    _settings_cache.pop(guild_id, None)
+    _onboarded_role_cache.pop(guild_id, None)
+    _approval_channel_cache.pop(guild_id, None)
+    _approver_roles_cache.pop(guild_id, None)
+    logger.debug("Invalidated cache for guild %s", guild_id)
@@ -3,9 +3,15 @@
 from typing import Optional, Dict, Any
 from datetime import datetime
 from sqlmodel import Field, SQLModel, JSON, Column, Relationship
-from sqlalchemy import UniqueConstraint, BigInteger, ForeignKey
+from sqlalchemy import UniqueConstraint, BigInteger, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.mutable import MutableDict
 import sqlalchemy as sa
 
+# JSON columns use jsonb on PostgreSQL (decomposed binary storage with
+# comparison and containment operators); other databases use plain JSON
+JSONType = JSON().with_variant(JSONB(), "postgresql")
+
 
 class Guild(SQLModel, table=True):
     """Support for multi-guild architecture from the start"""
@@ -18,7 +24,7 @@ class Guild(SQLModel, table=True):
     bot_token: str  # Encrypted - allows different bots per guild
     is_active: bool = True
     created_at: datetime = Field(default_factory=datetime.utcnow)
-    settings: Dict[str, Any] = Field(default={}, sa_column=Column(JSON))
+    settings: Dict[str, Any] = Field(default={}, sa_column=Column(JSONType))
 
     # Relationships
     configs: list["Config"] = Relationship(back_populates="guild")
@@ -32,10 +38,13 @@ class Config(SQLModel, table=True):
     """Per-guild configuration"""
 
     __tablename__ = "configs"
-    __table_args__ = (UniqueConstraint("key", "guild_id"),)
+    __table_args__ = (
+        UniqueConstraint("key", "guild_id"),
+        Index("ix_configs_guild_key", "guild_id", "key"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
-    key: str = Field(index=True)
+    key: str
     guild_id: int = Field(sa_column=Column(BigInteger, ForeignKey("guilds.guild_id")))
     value: str
     description: Optional[str] = None
@@ -69,7 +78,10 @@ class Channel(SQLModel, table=True):
     """Discord channels configuration"""
 
     __tablename__ = "channels"
-    __table_args__ = (UniqueConstraint("channel_id", "guild_id", "channel_type"),)
+    __table_args__ = (
+        UniqueConstraint("channel_id", "guild_id", "channel_type"),
+        Index("ix_channels_guild_type", "guild_id", "channel_type"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     channel_id: int = Field(sa_column=Column(BigInteger, index=True))
@@ -89,13 +101,16 @@ class Role(SQLModel, table=True):
     """Discord roles configuration"""
 
     __tablename__ = "roles"
-    __table_args__ = (UniqueConstraint("role_id", "guild_id"),)
+    __table_args__ = (
+        UniqueConstraint("role_id", "guild_id"),
+        Index("ix_roles_guild_type", "guild_id", "role_type"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     role_id: int = Field(sa_column=Column(BigInteger, index=True))
     role_name: str
     role_type: Optional[str] = None  # 'onboarded', 'admin'
-    permissions: Dict[str, Any] = Field(default={}, sa_column=Column(JSON))
+    permissions: Dict[str, Any] = Field(default={}, sa_column=Column(JSONType))
     guild_id: int = Field(sa_column=Column(BigInteger, ForeignKey("guilds.guild_id")))
 
     # Relationships
@@ -106,10 +121,13 @@ class Member(SQLModel, table=True):
     """Per-guild member data"""
 
     __tablename__ = "members"
-    __table_args__ = (UniqueConstraint("user_id", "guild_id"),)
+    __table_args__ = (
+        UniqueConstraint("user_id", "guild_id"),
+        Index("ix_members_guild_user", "guild_id", "user_id"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
-    user_id: int = Field(sa_column=Column(BigInteger, index=True))
+    user_id: int = Field(sa_column=Column(BigInteger))
     guild_id: int = Field(sa_column=Column(BigInteger, ForeignKey("guilds.guild_id")))
     username: str
     nickname: Optional[str] = None
@@ -121,7 +139,7 @@ class Member(SQLModel, table=True):
     onboarding_completed_at: Optional[datetime] = None
     last_change_datetime: Optional[datetime] = None
     extra_data: Dict[str, Any] = Field(
-        default={}, sa_column=Column(JSON)
+        default={}, sa_column=Column(MutableDict.as_mutable(JSONType))
     )  # Renamed from 'metadata' to avoid SQLAlchemy conflict
 
     # Relationships
@@ -132,6 +150,7 @@ class AuditLog(SQLModel, table=True):
     """Audit log for tracking all actions"""
 
     __tablename__ = "audit_logs"
+    __table_args__ = (Index("ix_audit_logs_guild_timestamp", "guild_id", "timestamp"),)
 
     id: Optional[int] = Field(default=None, primary_key=True)
     timestamp: datetime = Field(default_factory=datetime.utcnow, index=True)
@@ -139,5 +158,5 @@ class AuditLog(SQLModel, table=True):
     user_id: Optional[int] = Field(default=None, sa_column=Column(BigInteger))
     discord_username: Optional[str] = None
     action: str
-    details: Dict[str, Any] = Field(default={}, sa_column=Column(JSON))
+    details: Dict[str, Any] = Field(default={}, sa_column=Column(JSONType))
     ip_address: Optional[str] = None
@@ -4,7 +4,6 @@
 
 import os
 import sys
-import subprocess
 from pathlib import Path
 
 def is_venv():
@@ -15,8 +14,25 @@ def is_venv():
         os.environ.get('VIRTUAL_ENV') is not None
     )
 
+def read_venv_python_version(venv_path):
+    """Read the venv's Python version from pyvenv.cfg, or None if not recorded"""
+    try:
+        for line in (venv_path / 'pyvenv.cfg').read_text().splitlines():
+            key, _, value = line.partition('=')
+            if key.strip() in ('version', 'version_info'):
+                return f"Python {value.strip()}"
+    except OSError:
+        pass
+    return None
+
 def verify_venv_python_version(venv_python):
     """Verify the venv is using Python 3.13"""
+    # pyvenv.cfg records the version, which saves starting the interpreter
+    version = read_venv_python_version(Path(venv_python).parent.parent)
+    if version is not None:
+        return '3.13' in version, version
+
+    import subprocess
     try:
         result = subprocess.run(
             [str(venv_python), '--version'],
@@ -80,21 +96,30 @@ def check_env():
     """Check if .env file exists and has minimum configuration"""
     env_path = Path(".env")
 
-    if not env_path.exists():
+    if env_path.exists():
+        env_content = env_path.read_text()
+    else:
         print("[ERROR] .env file not found!")
         print("\nCreating .env from .env.example...")
 
         example_path = Path(".env.example")
         if example_path.exists():
-            env_path.write_text(example_path.read_text())
+            env_content = example_path.read_text()
+            env_path.write_text(env_content)
             print("[OK] Created .env file. Please edit it with your configuration.")
         else:
             print("[ERROR] .env.example not found either!")
             return False
 
+    # Parse KEY=value lines, skipping comments
+    lines = env_content.split('\n')
+    env_values = dict(
+        line.split('=', 1) for line in lines
+        if '=' in line and not line.lstrip().startswith('#')
+    )
+
     # Check if encryption key exists
-    env_content = env_path.read_text()
-    if "ENCRYPTION_KEY=" not in env_content or "ENCRYPTION_KEY=\n" in env_content or "ENCRYPTION_KEY=$" in env_content:
+    if not env_values.get('ENCRYPTION_KEY', '').strip():
         print("\n[WARNING] ENCRYPTION_KEY not set in .env")
         print("Generating encryption key...")
 
@@ -102,7 +127,6 @@ def check_env():
         key = Fernet.generate_key().decode()
 
         # Add or update encryption key in .env
-        lines = env_content.split('\n')
         key_found = False
         for i, line in enumerate(lines):
             if line.startswith('ENCRYPTION_KEY='):
@@ -125,7 +149,10 @@ def check_static_assets():
 
     if not htmx_file.exists():
         print("\nDownloading static assets...")
-        os.system("python download_assets.py")
+        from download_assets import main as download_assets
+
+        if download_assets() != 0:
+            print("[WARNING] The web interface needs these assets; run download_assets.py again")
     else:
         print("[OK] Static assets already downloaded")
 
@@ -154,12 +181,18 @@ def main():
     print("\nStarting Vela...")
     print("-" * 40)
 
-    # Start the application
-    try:
-        # Force unbuffered output
-        env = os.environ.copy()
-        env['PYTHONUNBUFFERED'] = '1'
+    # Force unbuffered output
+    env = os.environ.copy()
+    env['PYTHONUNBUFFERED'] = '1'
 
+    if sys.platform != 'win32':
+        # Replace this process with the app so signals reach it directly
+        sys.stdout.flush()
+        os.execve(sys.executable, [sys.executable, '-m', 'src.main'], env)
+
+    # Windows has no real exec, so run the app as a child process
+    import subprocess
+    try:
         # Use subprocess.run() which handles signals properly
         result = subprocess.run([sys.executable, '-m', 'src.main'], env=env)
         sys.exit(result.returncode)